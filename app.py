@@ -2,7 +2,7 @@
 import os
 import aws_cdk as cdk
 
-from cdk.core_stack import CoreStack
+from cdk.core_stack import CHANGE_INDEX, DOCUMENT_INDEXES, FACET_INDEXES, CoreStack
 from cdk.ingestion_stack import IngestionStack
 from cdk.frontend_stack import FrontendStack
 from cdk.api_stack import ApiStack
@@ -22,7 +22,22 @@ def name(suffix: str) -> str:
     return f"{project}-{stage}-{suffix}"
 
 
-core = CoreStack(app, "CoreStack", env=env, stack_name=name("core"))
+# DocumentsTable GSIs to deploy: comma-separated index names or "all". An
+# existing table accepts one new GSI per deploy, so grow the list one name
+# at a time (see README).
+index_context = app.node.try_get_context("documentIndexes") or ""
+if isinstance(index_context, str):
+    index_context = [n.strip() for n in index_context.split(",") if n.strip()]
+if index_context == ["all"]:
+    index_context = list(DOCUMENT_INDEXES)
+
+core = CoreStack(
+    app,
+    "CoreStack",
+    env=env,
+    stack_name=name("core"),
+    document_indexes=index_context,
+)
 
 nlp = NlpStack(
     app,
@@ -33,6 +48,9 @@ nlp = NlpStack(
     nlp_dir="nlp_service",
 )
 
+# SQS -> Lambda concurrency cap (>= 2); unset means no cap
+ingest_max_concurrency = app.node.try_get_context("ingestMaxConcurrency")
+
 ing = IngestionStack(
     app,
     "IngestionStack",
@@ -40,7 +58,13 @@ ing = IngestionStack(
     stack_name=name("ingestion"),
     docs_bucket=core.docs_bucket,
     documents_table=core.documents_table,
+    stats_table=core.stats_table,
     nlp_url=nlp.service_url,
+    batch_size=int(app.node.try_get_context("ingestBatchSize") or 10),
+    batch_window_seconds=int(app.node.try_get_context("ingestBatchWindowSeconds") or 5),
+    max_concurrency=int(ingest_max_concurrency) if ingest_max_concurrency else None,
+    timeout_seconds=int(app.node.try_get_context("ingestTimeoutSeconds") or 300),
+    memory_size=int(app.node.try_get_context("ingestMemoryMb") or 3538),
 )
 
 api = ApiStack(
@@ -49,10 +73,13 @@ api = ApiStack(
     env=env,
     stack_name=name("docapi"),
     documents_table=core.documents_table,
+    stats_table=core.stats_table,
     docs_bucket=core.docs_bucket,
     service_name=f"{project}-{stage}-docapi",
     docapi_dir="docapi",
     nlp_url=nlp.service_url,
+    gsi_query_enabled=any(i in core.document_indexes for i in FACET_INDEXES),
+    index_deltas_enabled=CHANGE_INDEX in core.document_indexes,
 )
 
 fe = FrontendStack(
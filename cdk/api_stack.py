@@ -18,10 +18,13 @@ class ApiStack(Stack):
         construct_id: str,
         *,
         documents_table: dynamodb.ITable,
+        stats_table: dynamodb.ITable,
         docs_bucket: s3.IBucket,
         nlp_url: str,
         service_name: str = "docstack-docapi",
         docapi_dir: str = "docapi",  # local path with Dockerfile + app
+        gsi_query_enabled: bool = True,  # False until the facet GSIs exist
+        index_deltas_enabled: bool = False,  # True once byUpdatedAt exists
         **kwargs,
     ) -> None:
         super().__init__(scope, construct_id, **kwargs)
@@ -49,6 +52,7 @@ class ApiStack(Stack):
             assumed_by=iam.ServicePrincipal("tasks.apprunner.amazonaws.com"),
         )
         documents_table.grant_read_write_data(instance_role)
+        stats_table.grant_read_write_data(instance_role)
         docs_bucket.grant_put(instance_role)
         docs_bucket.grant_read(instance_role)  # optional (only if you GET objects)
 
@@ -71,12 +75,23 @@ class ApiStack(Stack):
                             apprunner.CfnService.KeyValuePairProperty(
                                 name="DOCUMENTS_TABLE", value=documents_table.table_name
                             ),
+                            apprunner.CfnService.KeyValuePairProperty(
+                                name="STATS_TABLE", value=stats_table.table_name
+                            ),
                             apprunner.CfnService.KeyValuePairProperty(
                                 name="DOCS_BUCKET", value=docs_bucket.bucket_name
                             ),
                             apprunner.CfnService.KeyValuePairProperty(
                                 name="NLP_URL", value=nlp_url
                             ),
+                            apprunner.CfnService.KeyValuePairProperty(
+                                name="GSI_QUERY_ENABLED",
+                                value="true" if gsi_query_enabled else "false",
+                            ),
+                            apprunner.CfnService.KeyValuePairProperty(
+                                name="METADATA_INDEX_DELTAS",
+                                value="true" if index_deltas_enabled else "false",
+                            ),
                             # Region hints so the app can presign with the **regional** endpoint
                             apprunner.CfnService.KeyValuePairProperty(
                                 name="AWS_REGION", value=self.region
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, Sequence
 from aws_cdk import (
     Stack,
     Duration,
@@ -10,8 +10,28 @@ from aws_cdk import (
 from constructs import Construct
 
 
+# GSIs on DocumentsTable: name -> (partition key, sort key)
+DOCUMENT_INDEXES = {
+    # facets for the API's query planner
+    "byAgreementType": ("agreementType", None),
+    "byGoverningLaw": ("governingLaw", None),
+    "byIndustry": ("industry", None),
+    # rows by write time, for the API's incremental metadata index refresh
+    "byUpdatedAt": ("updatedDay", "updatedAt"),
+}
+FACET_INDEXES = ("byAgreementType", "byGoverningLaw", "byIndustry")
+CHANGE_INDEX = "byUpdatedAt"
+
+
 class CoreStack(Stack):
-    def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        *,
+        document_indexes: Optional[Sequence[str]] = None,
+        **kwargs,
+    ) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
         # Enable EventBridge so S3 object-created events go to the default event bus
@@ -48,5 +68,43 @@ class CoreStack(Stack):
             removal_policy=RemovalPolicy.RETAIN,
         )
 
+        # Ingestion writes the canonical facet values and the updatedDay /
+        # updatedAt change keys as top-level attributes; documents without a
+        # value are simply absent from the (sparse) index. DynamoDB creates
+        # or deletes only one GSI per table update, so an existing table gets
+        # them one deploy at a time via `document_indexes` (None = none).
+        wanted = set(document_indexes or ())
+        unknown = wanted - set(DOCUMENT_INDEXES)
+        if unknown:
+            raise ValueError(f"Unknown document index(es): {', '.join(sorted(unknown))}")
+        self.document_indexes = [name for name in DOCUMENT_INDEXES if name in wanted]
+        for index_name in self.document_indexes:
+            pk, sk = DOCUMENT_INDEXES[index_name]
+            self.documents_table.add_global_secondary_index(
+                index_name=index_name,
+                partition_key=dynamodb.Attribute(
+                    name=pk, type=dynamodb.AttributeType.STRING
+                ),
+                sort_key=(
+                    dynamodb.Attribute(name=sk, type=dynamodb.AttributeType.STRING)
+                    if sk
+                    else None
+                ),
+                projection_type=dynamodb.ProjectionType.INCLUDE,
+                non_key_attributes=["s3Key", "metadata"],
+            )
+
+        # Dashboard aggregates, maintained by ingestion with atomic counters
+        self.stats_table = dynamodb.Table(
+            self,
+            "StatsTable",
+            partition_key=dynamodb.Attribute(
+                name="statId", type=dynamodb.AttributeType.STRING
+            ),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            removal_policy=RemovalPolicy.RETAIN,
+        )
+
         CfnOutput(self, "DocsBucketName", value=self.docs_bucket.bucket_name)
         CfnOutput(self, "DocumentsTableName", value=self.documents_table.table_name)
+        CfnOutput(self, "StatsTableName", value=self.stats_table.table_name)
@@ -1,12 +1,16 @@
 # docstack/ingestion_stack.py
+from typing import Optional
+
 from aws_cdk import (
     Stack,
     Duration,
     BundlingOptions,
     aws_lambda as _lambda,
+    aws_lambda_event_sources as event_sources,
     aws_events as events,
     aws_events_targets as targets,
     aws_s3 as s3,
+    aws_sqs as sqs,
     aws_dynamodb as dynamodb,
 )
 from constructs import Construct
@@ -20,7 +24,13 @@ class IngestionStack(Stack):
         *,
         docs_bucket: s3.IBucket,
         documents_table: dynamodb.ITable,
+        stats_table: dynamodb.ITable,
         nlp_url: str,
+        batch_size: int = 10,
+        batch_window_seconds: int = 5,
+        max_concurrency: Optional[int] = None,
+        timeout_seconds: int = 300,
+        memory_size: int = 3538,
         **kwargs,
     ) -> None:
         super().__init__(scope, construct_id, **kwargs)
@@ -47,17 +57,26 @@ class IngestionStack(Stack):
                     ],
                 ),
             ),
-            timeout=Duration.seconds(60),
-            memory_size=512,
+            # a batch of `batch_size` documents (records run MAX_RECORD_WORKERS
+            # at a time) has to finish within one invocation
+            timeout=Duration.seconds(timeout_seconds),
+            # Lambda grants one vCPU per 1,769 MB; 3,538 MB gives the two that
+            # page-parallel PDF extraction needs (below that it stays serial)
+            memory_size=memory_size,
             environment={
                 "DOCUMENTS_TABLE": documents_table.table_name,
+                "STATS_TABLE": stats_table.table_name,
                 "DOCS_BUCKET": docs_bucket.bucket_name,
                 "TEXT_PREFIX": "extracted/",
                 "NLP_URL": nlp_url,
+                # one PDF may use a quarter of the invocation, leaving room
+                # for the rest of the batch, the NLP calls and the writes
+                "PDF_TIME_BUDGET_SECONDS": str(max(1, timeout_seconds // 4)),
             },
         )
 
         documents_table.grant_read_write_data(ingestion_fn)
+        stats_table.grant_read_write_data(ingestion_fn)
         docs_bucket.grant_read(ingestion_fn)
         docs_bucket.grant_put(ingestion_fn)
 
@@ -70,4 +89,28 @@ class IngestionStack(Stack):
                 detail={"bucket": {"name": [docs_bucket.bucket_name]}},
             ),
         )
-        rule.add_target(targets.LambdaFunction(ingestion_fn))
+
+        # EventBridge -> SQS -> Lambda: bursts of uploads queue up and arrive
+        # in batches instead of as one cold start per object
+        dlq = sqs.Queue(
+            self,
+            "IngestionDLQ",
+            retention_period=Duration.days(14),
+        )
+        queue = sqs.Queue(
+            self,
+            "IngestionQueue",
+            # AWS recommends >= 6x the function timeout for SQS sources
+            visibility_timeout=Duration.seconds(6 * timeout_seconds),
+            dead_letter_queue=sqs.DeadLetterQueue(max_receive_count=3, queue=dlq),
+        )
+        rule.add_target(targets.SqsQueue(queue))
+        ingestion_fn.add_event_source(
+            event_sources.SqsEventSource(
+                queue,
+                batch_size=batch_size,
+                max_batching_window=Duration.seconds(batch_window_seconds),
+                max_concurrency=max_concurrency,
+                report_batch_item_failures=True,
+            )
+        )
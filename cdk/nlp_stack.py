@@ -66,7 +66,7 @@ class NlpStack(Stack):
             ),
             health_check_configuration=apprunner.CfnService.HealthCheckConfigurationProperty(
                 protocol="HTTP",
-                path="/health",
+                path="/health/ready",  # 503 until models are loaded and warm
                 interval=10,
                 timeout=5,
                 healthy_threshold=1,
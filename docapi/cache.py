@@ -0,0 +1,129 @@
+# docapi/cache.py
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Protocol
+
+from docapi.filters import _norm
+
+logger = logging.getLogger(__name__)
+
+# Optional shared backend (graceful if not present)
+try:
+    import redis.asyncio as aioredis
+except Exception:
+    aioredis = None
+
+
+class CacheBackend(Protocol):
+    async def get(self, key: str) -> Optional[Dict[str, Any]]: ...
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None: ...
+
+
+class MemoryCache:
+    """Bounded LRU with a per-entry TTL, local to this process."""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 3600.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+
+class RedisCache:
+    """Shared across API instances; entries expire server-side."""
+
+    def __init__(self, url: str, ttl_seconds: float = 3600.0, prefix: str = "docapi:nlpq:"):
+        self._client = aioredis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = await self._client.get(self.prefix + key)
+        return json.loads(raw) if raw else None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        await self._client.set(
+            self.prefix + key, json.dumps(value), ex=int(self.ttl_seconds)
+        )
+
+
+def normalize_question(q: str) -> str:
+    """Case/whitespace-insensitive form so near-identical questions share a key."""
+    return " ".join(_norm(q).rstrip("?.! ").split())
+
+
+class QueryFilterCache:
+    """NLP-derived filters per normalised question, with hit/miss counters."""
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(question: str) -> str:
+        return hashlib.sha1(normalize_question(question).encode("utf-8")).hexdigest()
+
+    async def get(self, question: str) -> Optional[Dict[str, Any]]:
+        try:
+            value = await self.backend.get(self.key(question))
+        except Exception as e:  # a cache outage must not fail the query
+            logger.warning("Query cache get failed: %s", e)
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, question: str, filters: Dict[str, Any]) -> None:
+        try:
+            await self.backend.set(self.key(question), filters)
+        except Exception as e:
+            logger.warning("Query cache set failed: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def build_query_cache(
+    max_size: int, ttl_seconds: float, url: str = ""
+) -> Optional[QueryFilterCache]:
+    if max_size <= 0:
+        return None
+    if url:
+        if aioredis is not None:
+            return QueryFilterCache(RedisCache(url, ttl_seconds))
+        logger.warning("QUERY_CACHE_URL set but redis is not installed; using memory")
+    return QueryFilterCache(MemoryCache(max_size, ttl_seconds))
@@ -7,14 +7,58 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     # env names mapped explicitly
     documents_table: str = Field(default="", env="DOCUMENTS_TABLE")
+    stats_table: str = Field(default="", env="STATS_TABLE")
     docs_bucket: str = Field(default="", env="DOCS_BUCKET")
     nlp_url: str = Field(default="", env="NLP_URL")
 
+    # shared NLP http client (one pool for the app's lifetime)
+    nlp_timeout_seconds: float = Field(default=15.0, env="NLP_TIMEOUT_SECONDS")
+    nlp_max_connections: int = Field(default=50, env="NLP_MAX_CONNECTIONS")
+    nlp_max_keepalive_connections: int = Field(
+        default=20, env="NLP_MAX_KEEPALIVE_CONNECTIONS"
+    )
+    nlp_keepalive_expiry_seconds: float = Field(
+        default=60.0, env="NLP_KEEPALIVE_EXPIRY_SECONDS"
+    )
+    nlp_http2: bool = Field(default=True, env="NLP_HTTP2")
+
+    # cache of NLP-derived filters per question (size 0 disables;
+    # QUERY_CACHE_URL=redis://... shares it between instances)
+    query_cache_size: int = Field(default=1024, env="QUERY_CACHE_SIZE")
+    query_cache_ttl_seconds: float = Field(
+        default=3600.0, env="QUERY_CACHE_TTL_SECONDS"
+    )
+    query_cache_url: str = Field(default="", env="QUERY_CACHE_URL")
+
     # region fallbacks
     bucket_region: str = Field(default="", env="DOCS_BUCKET_REGION")
     aws_region: str = Field(default="", env="AWS_REGION")
     aws_default_region: str = Field(default="", env="AWS_DEFAULT_REGION")
 
+    # parallel segmented scans for full-table reads
+    scan_segments: int = Field(default=4, env="SCAN_SEGMENTS")
+    scan_max_workers: int = Field(default=4, env="SCAN_MAX_WORKERS")
+
+    # Query the facet GSIs instead of scanning when the index is cold
+    gsi_query_enabled: bool = Field(default=True, env="GSI_QUERY_ENABLED")
+
+    # in-memory metadata index for /query: built with a full scan, then
+    # refreshed from the byUpdatedAt GSI when METADATA_INDEX_DELTAS is on;
+    # the full scan repeats every METADATA_INDEX_RECONCILE_SECONDS
+    metadata_index_enabled: bool = Field(default=True, env="METADATA_INDEX_ENABLED")
+    metadata_index_deltas: bool = Field(default=False, env="METADATA_INDEX_DELTAS")
+    metadata_index_refresh_seconds: float = Field(
+        default=60.0, env="METADATA_INDEX_REFRESH_SECONDS"
+    )
+    metadata_index_reconcile_seconds: float = Field(
+        default=3600.0, env="METADATA_INDEX_RECONCILE_SECONDS"
+    )
+
+    # re-count the dashboard counters from a full scan this often (0 = never)
+    dashboard_reconcile_seconds: float = Field(
+        default=3600.0, env="DASHBOARD_RECONCILE_SECONDS"
+    )
+
     # pydantic-settings config
     model_config = SettingsConfigDict(case_sensitive=False, extra="ignore")
 
@@ -1,11 +1,13 @@
 # app/dependencies.py
-from typing import Dict, Any, AsyncIterator
+from typing import Dict, Any, Optional
 from functools import lru_cache
 import boto3
 from botocore.config import Config
 import httpx
-from fastapi import Depends
+from fastapi import Request
 from .config import get_settings, Settings
+from .cache import QueryFilterCache, build_query_cache
+from .index import MetadataIndex
 
 
 @lru_cache()
@@ -20,13 +22,47 @@ def _boto3_clients() -> Dict[str, Any]:
     docs_table = (
         dynamodb.Table(settings.documents_table) if settings.documents_table else None
     )
-    return {"s3": s3, "docs_table": docs_table}
+    stats_table = (
+        dynamodb.Table(settings.stats_table) if settings.stats_table else None
+    )
+    return {"s3": s3, "docs_table": docs_table, "stats_table": stats_table}
 
 
 def aws_clients() -> Dict[str, Any]:
     return _boto3_clients()
 
 
-async def http_client() -> AsyncIterator[httpx.AsyncClient]:
-    async with httpx.AsyncClient(timeout=15) as client:
-        yield client
+@lru_cache()
+def metadata_index() -> MetadataIndex:
+    return MetadataIndex()
+
+
+@lru_cache()
+def query_cache() -> Optional[QueryFilterCache]:
+    settings: Settings = get_settings()
+    return build_query_cache(
+        settings.query_cache_size,
+        settings.query_cache_ttl_seconds,
+        settings.query_cache_url,
+    )
+
+
+def build_http_client(settings: Settings) -> httpx.AsyncClient:
+    """Pooled keep-alive client for the NLP service; owned by the app lifespan."""
+    return httpx.AsyncClient(
+        timeout=settings.nlp_timeout_seconds,
+        http2=settings.nlp_http2,
+        limits=httpx.Limits(
+            max_connections=settings.nlp_max_connections,
+            max_keepalive_connections=settings.nlp_max_keepalive_connections,
+            keepalive_expiry=settings.nlp_keepalive_expiry_seconds,
+        ),
+    )
+
+
+def http_client(request: Request) -> httpx.AsyncClient:
+    state = request.app.state
+    if getattr(state, "http_client", None) is None:
+        # lifespan not run (e.g. mounted without startup); create on first use
+        state.http_client = build_http_client(get_settings())
+    return state.http_client
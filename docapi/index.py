@@ -0,0 +1,234 @@
+# docapi/index.py
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import anyio
+from boto3.dynamodb.conditions import Key
+
+from docapi.filters import _canon_field, _norm
+from docapi.utils import projection_kwargs, query_table_paginated, scan_table_paginated
+
+logger = logging.getLogger(__name__)
+
+INDEXED_FIELDS = ("agreement_type", "industry", "governing_law")
+
+# attribute paths `match_row` and the index need; everything else stays in DynamoDB
+MATCH_PROJECTION = ("documentId", "s3Key") + tuple(
+    f"metadata.{f}" for f in INDEXED_FIELDS
+)
+
+
+# GSI keyed by updatedDay (YYYY-MM-DD) / updatedAt, written by ingestion
+CHANGE_INDEX = "byUpdatedAt"
+# deltas re-read this far behind the previous refresh, covering GSI
+# propagation lag and clock skew between ingestion and the API
+DELTA_OVERLAP_SECONDS = 120.0
+
+
+def match_row(item: Dict[str, Any]) -> Dict[str, Any]:
+    """The QueryMatch shape for a DocumentsTable item."""
+    meta = item.get("metadata", {}) or {}
+    return {
+        "document": item.get("s3Key"),
+        "governing_law": meta.get("governing_law"),
+        "agreement_type": meta.get("agreement_type"),
+        "industry": meta.get("industry"),
+    }
+
+
+def _index_key(field: str, value: Optional[str]) -> str:
+    # same canon + normalisation `filters._match` applies to the stored side
+    return _norm(_canon_field(field, value))
+
+
+class MetadataIndex:
+    """
+    In-process inverted index over the canonical metadata facets.
+
+    Postings map field -> normalised canonical value -> documentIds, so a
+    filter lookup is a union over the (small) set of matching values per
+    field followed by an intersection across fields.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._postings: Dict[str, Dict[str, Set[str]]] = {
+            f: {} for f in INDEXED_FIELDS
+        }
+        self.ready = False
+        self.last_refresh: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # ---- maintenance ----
+    def _unlink(self, doc_id: str) -> None:
+        row = self._rows.pop(doc_id, None)
+        if row is None:
+            return
+        for field in INDEXED_FIELDS:
+            key = _index_key(field, row.get(field))
+            ids = self._postings[field].get(key)
+            if ids is None:
+                continue
+            ids.discard(doc_id)
+            if not ids:
+                del self._postings[field][key]
+
+    def _link(self, doc_id: str, row: Dict[str, Any]) -> None:
+        self._rows[doc_id] = row
+        for field in INDEXED_FIELDS:
+            key = _index_key(field, row.get(field))
+            if key:
+                self._postings[field].setdefault(key, set()).add(doc_id)
+
+    def upsert(self, item: Dict[str, Any]) -> None:
+        doc_id = item.get("documentId")
+        if not doc_id:
+            return
+        row = match_row(item)
+        with self._lock:
+            if self._rows.get(doc_id) == row:
+                return
+            self._unlink(doc_id)
+            self._link(doc_id, row)
+
+    def remove(self, document_id: str) -> None:
+        with self._lock:
+            self._unlink(document_id)
+
+    def upsert_many(self, items: Iterable[Dict[str, Any]]) -> Set[str]:
+        """Upsert a page of items; returns the documentIds seen."""
+        seen: Set[str] = set()
+        for item in items:
+            doc_id = item.get("documentId")
+            if doc_id:
+                seen.add(doc_id)
+                self.upsert(item)
+        return seen
+
+    def retain(self, seen: Set[str]) -> None:
+        """Drop documents missing from the latest snapshot and mark the index ready."""
+        with self._lock:
+            for doc_id in [d for d in self._rows if d not in seen]:
+                self._unlink(doc_id)
+        self.ready = True
+        self.last_refresh = time.time()
+
+    def sync(self, items: Iterable[Dict[str, Any]]) -> None:
+        """Apply a full snapshot as a diff: upsert what changed, drop what vanished."""
+        self.retain(self.upsert_many(items))
+
+    # ---- lookup ----
+    def _candidates(self, field: str, want: str) -> Set[str]:
+        wn = _index_key(field, want)
+        out: Set[str] = set()
+        for key, ids in self._postings[field].items():
+            # mirrors filters._match: exact, prefix or substring
+            if key == wn or key.startswith(wn) or wn in key:
+                out |= ids
+        return out
+
+    def lookup(self, filters: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Rows matching every filter, or None when a filter targets a field
+        the index does not cover (caller should fall back to a scan).
+        """
+        wanted = {k: v for k, v in filters.items() if v}
+        if any(k not in INDEXED_FIELDS for k in wanted):
+            return None
+        with self._lock:
+            if not wanted:
+                ids = set(self._rows)
+            else:
+                sets = sorted(
+                    (self._candidates(k, v) for k, v in wanted.items()), key=len
+                )
+                ids = sets[0].intersection(*sets[1:])
+            rows = [self._rows[i] for i in ids]
+        return sorted(rows, key=lambda r: r.get("document") or "")
+
+
+async def refresh_index(
+    index: MetadataIndex, table, segments: int = 1, max_workers: Optional[int] = None
+) -> None:
+    seen: Set[str] = set()
+    async for page in scan_table_paginated(
+        table,
+        segments=segments,
+        max_workers=max_workers,
+        projection=MATCH_PROJECTION,
+    ):
+        seen |= index.upsert_many(page)
+    index.retain(seen)
+    logger.info("Metadata index refreshed: %d document(s)", len(index))
+
+
+def _iso(ts: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts))
+
+
+async def refresh_index_delta(index: MetadataIndex, table, since: float) -> int:
+    """
+    Upsert the rows written since `since` (epoch seconds) by querying the
+    change GSI, one updatedDay partition at a time. Returns the row count.
+    Deletions are only picked up by the next full refresh.
+    """
+    start = since - DELTA_OVERLAP_SECONDS
+    start_iso = _iso(start)
+    day = datetime.fromtimestamp(start, timezone.utc).date()
+    today = datetime.now(timezone.utc).date()
+    count = 0
+    while day <= today:
+        items = await query_table_paginated(
+            table,
+            IndexName=CHANGE_INDEX,
+            KeyConditionExpression=Key("updatedDay").eq(day.isoformat())
+            & Key("updatedAt").gte(start_iso),
+            **projection_kwargs(MATCH_PROJECTION),
+        )
+        index.upsert_many(items)
+        count += len(items)
+        day += timedelta(days=1)
+    index.last_refresh = time.time()
+    return count
+
+
+async def run_index_refresher(
+    index: MetadataIndex,
+    table,
+    interval: float,
+    segments: int = 1,
+    max_workers: Optional[int] = None,
+    reconcile_interval: float = 3600.0,
+    deltas: bool = False,
+) -> None:
+    """
+    Build the index with a full scan, then refresh it every `interval`
+    seconds in the background. Without `deltas` every refresh is a full
+    scan; with them, refreshes read the change GSI and the full scan (which
+    also drops deleted rows) only repeats every `reconcile_interval`.
+    """
+    last_full: Optional[float] = None
+    last_refresh: Optional[float] = None
+    while True:
+        started = time.time()
+        try:
+            if (
+                not deltas
+                or last_full is None
+                or started - last_full >= reconcile_interval
+            ):
+                await refresh_index(index, table, segments, max_workers)
+                last_full = started
+            else:
+                n = await refresh_index_delta(index, table, last_refresh)
+                logger.info("Metadata index delta: %d changed document(s)", n)
+            last_refresh = started
+        except Exception as e:  # keep serving the last good snapshot
+            logger.warning("Metadata index refresh failed: %s", e)
+        await anyio.sleep(interval)
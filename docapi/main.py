@@ -1,11 +1,20 @@
 # docapi/main.py
+import asyncio
+from contextlib import asynccontextmanager
 from typing import List, Dict, Any
 
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 
 from docapi.config import get_settings
-from docapi.services import DocumentService, QueryService
+from docapi.dependencies import (
+    aws_clients,
+    build_http_client,
+    metadata_index,
+    query_cache,
+)
+from docapi.index import run_index_refresher
+from docapi.services import DocumentService, QueryService, run_dashboard_reconciler
 from docapi.models import (
     PresignBody,
     PresignResponse,
@@ -14,7 +23,53 @@ from docapi.models import (
     DashboardResponse,
 )
 
-app = FastAPI(docs_url="/api-docs", redoc_url=None, openapi_url="/openapi.json")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_settings()
+    app.state.http_client = build_http_client(settings)
+    clients = aws_clients()
+    docs_table = clients["docs_table"]
+    refresher = reconciler = None
+    if settings.metadata_index_enabled and docs_table is not None:
+        refresher = asyncio.create_task(
+            run_index_refresher(
+                metadata_index(),
+                docs_table,
+                settings.metadata_index_refresh_seconds,
+                settings.scan_segments,
+                settings.scan_max_workers,
+                reconcile_interval=settings.metadata_index_reconcile_seconds,
+                deltas=settings.metadata_index_deltas,
+            )
+        )
+    if (
+        settings.dashboard_reconcile_seconds > 0
+        and docs_table is not None
+        and clients["stats_table"] is not None
+    ):
+        reconciler = asyncio.create_task(
+            run_dashboard_reconciler(
+                docs_table,
+                clients["stats_table"],
+                settings.dashboard_reconcile_seconds,
+                settings.scan_segments,
+                settings.scan_max_workers,
+            )
+        )
+    yield
+    for task in (refresher, reconciler):
+        if task is not None:
+            task.cancel()
+    await app.state.http_client.aclose()
+
+
+app = FastAPI(
+    docs_url="/api-docs",
+    redoc_url=None,
+    openapi_url="/openapi.json",
+    lifespan=lifespan,
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # tighten in prod
@@ -26,7 +81,13 @@ app.add_middleware(
 @app.get("/health")
 def health():
     s = get_settings()
-    return {"ok": True, "region": s.docs_bucket_region, "nlp_url": s.nlp_url}
+    cache = query_cache()
+    return {
+        "ok": True,
+        "region": s.docs_bucket_region,
+        "nlp_url": s.nlp_url,
+        "query_cache": cache.stats() if cache else None,
+    }
 
 
 @app.get("/docs")
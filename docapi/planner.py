@@ -0,0 +1,104 @@
+# docapi/planner.py
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+from docapi.filters import (
+    AGREE_SYNONYMS,
+    INDUSTRY_SYNONYMS,
+    LAW_SYNONYMS,
+    _canon_field,
+    matches,
+)
+from docapi.index import MATCH_PROJECTION
+from docapi.utils import projection_kwargs, query_table_paginated
+
+logger = logging.getLogger(__name__)
+
+# filter field -> (GSI name, top-level key attribute written by ingestion)
+FACET_INDEXES = {
+    "agreement_type": ("byAgreementType", "agreementType"),
+    "governing_law": ("byGoverningLaw", "governingLaw"),
+    "industry": ("byIndustry", "industry"),
+}
+
+# Only canonical vocab values are guaranteed to equal the stored GSI key;
+# anything else relies on the partial matching in filters.matches.
+CANONICAL_VALUES = {
+    "agreement_type": set(AGREE_SYNONYMS.values()),
+    "governing_law": set(LAW_SYNONYMS.values()),
+    "industry": set(INDUSTRY_SYNONYMS.values()),
+}
+
+# dashboard bucket -> filter field
+BUCKET_FIELDS = {
+    "agreement_types": "agreement_type",
+    "jurisdictions": "governing_law",
+    "industries": "industry",
+}
+
+
+def facet_counts(agg: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, int]]:
+    """Per-field document counts keyed by canonical value, from dashboard counters."""
+    out: Dict[str, Dict[str, int]] = {}
+    for bucket, counts in (agg or {}).items():
+        field = BUCKET_FIELDS.get(bucket)
+        if not field:
+            continue
+        per_field = out.setdefault(field, {})
+        for value, n in counts.items():
+            canon = _canon_field(field, value)
+            per_field[canon] = per_field.get(canon, 0) + int(n)
+    return out
+
+
+def choose_index(
+    filters: Dict[str, Any], counts: Optional[Dict[str, Dict[str, int]]] = None
+) -> Optional[Tuple[str, str]]:
+    """
+    Pick (field, canonical value) whose GSI partition is smallest. Without
+    counts the first usable field in FACET_INDEXES order wins.
+    """
+    best = None
+    for order, field in enumerate(FACET_INDEXES):
+        want = filters.get(field)
+        if not want:
+            continue
+        canon = _canon_field(field, want)
+        if canon not in CANONICAL_VALUES[field]:
+            continue
+        size = (counts or {}).get(field, {}).get(canon)
+        rank = (size if size is not None else float("inf"), order)
+        if best is None or rank < best[0]:
+            best = (rank, field, canon)
+    return (best[1], best[2]) if best else None
+
+
+async def query_with_index(
+    table,
+    filters: Dict[str, Any],
+    counts: Optional[Dict[str, Dict[str, int]]] = None,
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Query the most selective facet GSI and apply the remaining predicates.
+    Returns None when no index applies (or the table has no such GSI) so the
+    caller can fall back to a scan.
+    """
+    plan = choose_index(filters, counts)
+    if plan is None:
+        return None
+    field, value = plan
+    index_name, attr = FACET_INDEXES[field]
+    try:
+        items = await query_table_paginated(
+            table,
+            IndexName=index_name,
+            KeyConditionExpression=Key(attr).eq(value),
+            **projection_kwargs(MATCH_PROJECTION),
+        )
+    except ClientError as e:
+        logger.warning("GSI query on %s failed, falling back to scan: %s", index_name, e)
+        return None
+    return [i for i in items if matches(i.get("metadata", {}) or {}, filters)]
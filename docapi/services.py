@@ -1,15 +1,25 @@
 # app/services.py
-from typing import List, Dict, Any
+import logging
+import time
+from decimal import Decimal
+from typing import List, Dict, Any, Optional
 from uuid import uuid4
+import anyio
 from fastapi import Depends, HTTPException
 import httpx
+from botocore.exceptions import ClientError
 
 from docapi.config import get_settings, Settings
 from docapi.dependencies import (
     aws_clients as get_aws_clients,
     http_client as get_http_client,
+    metadata_index as get_metadata_index,
+    query_cache as get_query_cache,
 )
-from docapi.utils import sanitize_filename, scan_table_paginated
+from docapi.cache import QueryFilterCache
+from docapi.index import MATCH_PROJECTION, MetadataIndex, match_row
+from docapi.planner import facet_counts, query_with_index
+from docapi.utils import sanitize_filename, scan_table_paginated, run_table_call
 from docapi.filters import (
     build_filters_from_question,
     build_filters_from_nlp,
@@ -17,6 +27,156 @@ from docapi.filters import (
     matches,
 )
 
+logger = logging.getLogger(__name__)
+
+DASHBOARD_STAT_ID = "dashboard"
+DASHBOARD_BUCKETS = ("agreement_types", "jurisdictions", "industries")
+# scans per reconcile before giving up to concurrent counter updates
+RECONCILE_MAX_ATTEMPTS = 3
+DASHBOARD_PROJECTION = (
+    "metadata.agreement_type",
+    "metadata.governing_law",
+    "metadata.jurisdiction",
+    "metadata.industry",
+)
+
+
+def _stats_item(agg: Dict[str, Dict[str, int]]) -> Dict[str, Any]:
+    """The StatsTable dashboard item for scanned counts, stamped reconciledAt."""
+    item: Dict[str, Any] = {
+        "statId": DASHBOARD_STAT_ID,
+        "reconciledAt": Decimal(int(time.time())),
+    }
+    for bucket, counts in agg.items():
+        for value, count in counts.items():
+            item[f"{bucket}#{value}"] = count
+    return item
+
+
+def _counters_from_stats_item(item: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+    """Unflatten "<bucket>#<value>" counter attributes written by ingestion."""
+    agg: Dict[str, Dict[str, int]] = {b: {} for b in DASHBOARD_BUCKETS}
+    for attr, count in item.items():
+        bucket, sep, value = attr.partition("#")
+        if sep and bucket in agg and value and int(count) > 0:
+            agg[bucket][value] = int(count)
+    return agg
+
+
+async def _read_dashboard_counters(stats_table) -> Optional[Dict[str, Dict[str, int]]]:
+    if stats_table is None:
+        return None
+    resp = await run_table_call(stats_table.get_item, Key={"statId": DASHBOARD_STAT_ID})
+    item = resp.get("Item")
+    return _counters_from_stats_item(item) if item else None
+
+
+async def aggregate_dashboard(
+    docs_table, segments: int = 1, max_workers: Optional[int] = None
+) -> Dict[str, Dict[str, int]]:
+    """Dashboard counts from a full scan of DocumentsTable."""
+    agg = {
+        "agreement_types": {},
+        "jurisdictions": {},
+        "industries": {},
+    }
+
+    def inc(bucket: dict, key: str):
+        if key:
+            bucket[key] = bucket.get(key, 0) + 1
+
+    async for page in scan_table_paginated(
+        docs_table,
+        segments=segments,
+        max_workers=max_workers,
+        projection=DASHBOARD_PROJECTION,
+    ):
+        for item in page:
+            meta = item.get("metadata", {})
+            inc(agg["agreement_types"], meta.get("agreement_type"))
+            inc(
+                agg["jurisdictions"],
+                meta.get("governing_law") or meta.get("jurisdiction"),
+            )
+            inc(agg["industries"], meta.get("industry"))
+
+    return agg
+
+
+async def reconcile_dashboard_stats(
+    docs_table,
+    stats_table,
+    segments: int = 1,
+    max_workers: Optional[int] = None,
+    min_age: float = 0.0,
+) -> bool:
+    """
+    Replace the dashboard counters with counts from a fresh scan. Ingestion
+    skips its ADDs until the item is seeded, and ADDs landing while a seed's
+    scan runs are lost, so the counters drift without this. Returns False
+    (without scanning) when another instance reconciled within `min_age`
+    seconds.
+
+    Every ingestion ADD also bumps `counterVersion`; the scan result is only
+    written if that is unchanged since the scan started, so ADDs made during
+    the scan aren't overwritten. The scan is retried up to
+    RECONCILE_MAX_ATTEMPTS times, then the counters are left for next run.
+    """
+    for attempt in range(RECONCILE_MAX_ATTEMPTS):
+        resp = await run_table_call(
+            stats_table.get_item,
+            Key={"statId": DASHBOARD_STAT_ID},
+            ProjectionExpression="reconciledAt, counterVersion",
+        )
+        stored = resp.get("Item") or {}
+        last = stored.get("reconciledAt")
+        if last is not None and time.time() - float(last) < min_age:
+            return False
+        version = stored.get("counterVersion")
+        agg = await aggregate_dashboard(docs_table, segments, max_workers)
+        item = _stats_item(agg)
+        if version is None:
+            condition = {"ConditionExpression": "attribute_not_exists(counterVersion)"}
+        else:
+            item["counterVersion"] = version
+            condition = {
+                "ConditionExpression": "counterVersion = :v",
+                "ExpressionAttributeValues": {":v": version},
+            }
+        try:
+            await run_table_call(stats_table.put_item, Item=item, **condition)
+        except stats_table.meta.client.exceptions.ConditionalCheckFailedException:
+            logger.info(
+                "Dashboard counters changed during reconcile scan %d; rescanning",
+                attempt + 1,
+            )
+            continue
+        logger.info("Dashboard counters reconciled from scan: %s", agg)
+        return True
+    logger.warning(
+        "Dashboard counters kept changing; reconcile skipped after %d scans",
+        RECONCILE_MAX_ATTEMPTS,
+    )
+    return False
+
+
+async def run_dashboard_reconciler(
+    docs_table,
+    stats_table,
+    interval: float,
+    segments: int = 1,
+    max_workers: Optional[int] = None,
+) -> None:
+    """Reconcile the dashboard counters every `interval` seconds (shared across instances)."""
+    while True:
+        await anyio.sleep(interval)
+        try:
+            await reconcile_dashboard_stats(
+                docs_table, stats_table, segments, max_workers, min_age=interval / 2
+            )
+        except Exception as e:  # counters stay as they are until the next run
+            logger.warning("Dashboard reconcile failed: %s", e)
+
 
 class DocumentService:
     def __init__(
@@ -26,12 +186,18 @@ class DocumentService:
     ):
         self.s3 = aws_clients["s3"]
         self.docs_table = aws_clients["docs_table"]
+        self.stats_table = aws_clients.get("stats_table")
         self.bucket = settings.docs_bucket
+        self.scan_segments = settings.scan_segments
+        self.scan_max_workers = settings.scan_max_workers
 
     async def list_documents(self, limit: int = 25) -> List[Dict[str, Any]]:
         if not self.docs_table:
             return []
-        return await scan_table_paginated(self.docs_table, limit)
+        items: List[Dict[str, Any]] = []
+        async for page in scan_table_paginated(self.docs_table, limit):
+            items.extend(page)
+        return items
 
     def generate_presigned_url(self, filename: str) -> dict:
         key = f"uploads/{uuid4()}-{sanitize_filename(filename)}"
@@ -55,27 +221,31 @@ class DocumentService:
                 status_code=500, detail="DOCUMENTS_TABLE not configured"
             )
 
-        agg = {
-            "agreement_types": {},
-            "jurisdictions": {},
-            "industries": {},
-        }
+        # fast path: counters maintained at ingestion time
+        counters = await _read_dashboard_counters(self.stats_table)
+        if counters is not None:
+            return {"ok": True, **counters}
+
+        agg = await self._aggregate_from_scan()
+        if self.stats_table is not None:
+            await self._seed_stats(agg)
+        return {"ok": True, **agg}
 
-        def inc(bucket: dict, key: str):
-            if key:
-                bucket[key] = bucket.get(key, 0) + 1
+    async def _aggregate_from_scan(self) -> Dict[str, Dict[str, int]]:
+        return await aggregate_dashboard(
+            self.docs_table, self.scan_segments, self.scan_max_workers
+        )
 
-        items = await scan_table_paginated(self.docs_table)
-        for item in items:
-            meta = item.get("metadata", {})
-            inc(agg["agreement_types"], meta.get("agreement_type"))
-            inc(
-                agg["jurisdictions"],
-                meta.get("governing_law") or meta.get("jurisdiction"),
+    async def _seed_stats(self, agg: Dict[str, Dict[str, int]]) -> None:
+        """Write the initial counters once; ingestion keeps them current after."""
+        try:
+            await run_table_call(
+                self.stats_table.put_item,
+                Item=_stats_item(agg),
+                ConditionExpression="attribute_not_exists(statId)",
             )
-            inc(agg["industries"], meta.get("industry"))
-
-        return {"ok": True, **agg}
+        except self.stats_table.meta.client.exceptions.ConditionalCheckFailedException:
+            pass
 
 
 class QueryService:
@@ -84,10 +254,18 @@ class QueryService:
         aws_clients: Dict[str, Any] = Depends(get_aws_clients),
         http_client: httpx.AsyncClient = Depends(get_http_client),
         settings: Settings = Depends(get_settings),
+        index: MetadataIndex = Depends(get_metadata_index),
+        cache: Optional[QueryFilterCache] = Depends(get_query_cache),
     ):
         self.docs_table = aws_clients["docs_table"]
+        self.stats_table = aws_clients.get("stats_table")
         self.http_client = http_client
         self.nlp_url = settings.nlp_url
+        self.gsi_query_enabled = settings.gsi_query_enabled
+        self.scan_segments = settings.scan_segments
+        self.scan_max_workers = settings.scan_max_workers
+        self.index = index if settings.metadata_index_enabled else None
+        self.cache = cache
 
     async def query_documents(self, question: str) -> dict:
         question = (question or "").strip()
@@ -99,7 +277,52 @@ class QueryService:
         # 1) user-entered filters
         q_filters = build_filters_from_question(question)
 
-        # 2) nlp extraction
+        # 2) nlp extraction (cached per normalised question)
+        nlp_filters = await self.cache.get(question) if self.cache else None
+        if nlp_filters is None:
+            nlp_filters = await self._nlp_filters(question)
+
+        # 3) merge
+        filters = {**nlp_filters, **q_filters}
+        if not filters:
+            return {"ok": True, "filters_applied": {}, "matches": []}
+
+        # 4) index lookup when warm
+        if self.index is not None and self.index.ready:
+            results = self.index.lookup(filters)
+            if results is not None:
+                return {"ok": True, "filters_applied": filters, "matches": results}
+
+        # 5) GSI query on the most selective facet
+        if self.gsi_query_enabled:
+            try:
+                counters = await _read_dashboard_counters(self.stats_table)
+            except ClientError:
+                counters = None  # selectivity hint only
+            items = await query_with_index(
+                self.docs_table, filters, facet_counts(counters)
+            )
+            if items is not None:
+                results = [match_row(i) for i in items]
+                return {"ok": True, "filters_applied": filters, "matches": results}
+
+        # 6) scan + match, page by page
+        results = []
+        async for page in scan_table_paginated(
+            self.docs_table,
+            segments=self.scan_segments,
+            max_workers=self.scan_max_workers,
+            projection=MATCH_PROJECTION,
+        ):
+            results.extend(
+                match_row(item)
+                for item in page
+                if matches(item.get("metadata", {}) or {}, filters)
+            )
+
+        return {"ok": True, "filters_applied": filters, "matches": results}
+
+    async def _nlp_filters(self, question: str) -> Dict[str, Any]:
         try:
             nlp_payload = {"text": question, "context": build_nlp_context(question)}
             resp = await self.http_client.post(
@@ -108,28 +331,9 @@ class QueryService:
             resp.raise_for_status()
             nlp_raw = resp.json() or {}
         except httpx.HTTPError:
-            nlp_raw = {}
+            return {}  # transient; don't cache
 
         nlp_filters = build_filters_from_nlp(nlp_raw, min_conf=0.7)
-
-        # 3) merge
-        filters = {**nlp_filters, **q_filters}
-        if not filters:
-            return {"ok": True, "filters_applied": {}, "matches": []}
-
-        # 4) scan + match
-        items = await scan_table_paginated(self.docs_table)
-        results = []
-        for item in items:
-            meta = item.get("metadata", {}) or {}
-            if matches(meta, filters):
-                results.append(
-                    {
-                        "document": item.get("s3Key"),
-                        "governing_law": meta.get("governing_law"),
-                        "agreement_type": meta.get("agreement_type"),
-                        "industry": meta.get("industry"),
-                    }
-                )
-
-        return {"ok": True, "filters_applied": filters, "matches": results}
+        if self.cache is not None:
+            await self.cache.set(question, nlp_filters)
+        return nlp_filters
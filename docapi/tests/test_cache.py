@@ -0,0 +1,80 @@
+import asyncio
+
+from docapi.cache import MemoryCache, QueryFilterCache, normalize_question
+from docapi.services import QueryService
+
+
+# ---------- helpers / fakes ----------
+
+
+class FakeResponse:
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"agreement_type": "NDA", "agreement_type_confidence": 0.9}
+
+
+class FakeHttpClient:
+    def __init__(self):
+        self.calls = 0
+
+    async def post(self, url, json):
+        self.calls += 1
+        return FakeResponse()
+
+
+class FakeSettings:
+    nlp_url = "http://nlp.local"
+    metadata_index_enabled = False
+    gsi_query_enabled = False
+    scan_segments = 1
+    scan_max_workers = 1
+
+
+class EmptyTable:
+    def scan(self, **kwargs):
+        return {"Items": []}
+
+
+# ---------- tests ----------
+
+
+def test_memory_cache_evicts_lru_and_expires():
+    cache = MemoryCache(max_size=2, ttl_seconds=60)
+
+    async def _run():
+        await cache.set("a", {"x": 1})
+        await cache.set("b", {"x": 2})
+        await cache.get("a")  # a is now most recent
+        await cache.set("c", {"x": 3})
+        return await cache.get("a"), await cache.get("b")
+
+    assert asyncio.run(_run()) == ({"x": 1}, None)
+
+    expired = MemoryCache(max_size=2, ttl_seconds=-1)
+    asyncio.run(expired.set("a", {"x": 1}))
+    assert asyncio.run(expired.get("a")) is None
+
+
+def test_normalize_question():
+    assert normalize_question("  NDAs under   UK law? ") == "ndas under uk law"
+
+
+def test_repeated_question_skips_nlp_round_trip():
+    http = FakeHttpClient()
+    cache = QueryFilterCache(MemoryCache())
+    svc = QueryService(
+        aws_clients={"docs_table": EmptyTable()},
+        http_client=http,
+        settings=FakeSettings(),
+        index=None,
+        cache=cache,
+    )
+
+    asyncio.run(svc.query_documents("Show me confidentiality agreements"))
+    second = asyncio.run(svc.query_documents("show me confidentiality agreements?"))
+
+    assert http.calls == 1
+    assert second["filters_applied"]["agreement_type"] == "NDA"  # from the cache
+    assert cache.stats() == {"backend": "MemoryCache", "hits": 1, "misses": 1}
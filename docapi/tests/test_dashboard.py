@@ -0,0 +1,211 @@
+import asyncio
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+
+from docapi.services import (
+    RECONCILE_MAX_ATTEMPTS,
+    DocumentService,
+    reconcile_dashboard_stats,
+)
+
+
+# ---------- helpers / fakes ----------
+
+
+class ConditionalCheckFailedException(Exception):
+    pass
+
+
+class FakeTable:
+    def __init__(self, items=None):
+        self.items = {i[self.key]: i for i in items or []}
+        self.scans = 0
+        self.meta = SimpleNamespace(
+            client=SimpleNamespace(
+                exceptions=SimpleNamespace(
+                    ConditionalCheckFailedException=ConditionalCheckFailedException
+                )
+            )
+        )
+
+    key = "documentId"
+
+    def scan(self, Segment=0, TotalSegments=1, **kwargs):
+        self.scans += 1
+        items = list(self.items.values())
+        return {"Items": items[Segment::TotalSegments]}
+
+    def get_item(self, Key, **kwargs):
+        item = self.items.get(Key[self.key])
+        return {"Item": item} if item else {}
+
+    def put_item(self, Item, ConditionExpression=None):
+        if ConditionExpression and Item[self.key] in self.items:
+            raise ConditionalCheckFailedException()
+        self.items[Item[self.key]] = Item
+        return {}
+
+
+class FakeStatsTable(FakeTable):
+    key = "statId"
+
+    def put_item(self, Item, ConditionExpression=None, ExpressionAttributeValues=None):
+        stored = self.items.get(Item[self.key], {})
+        if ConditionExpression == "attribute_not_exists(statId)":
+            ok = not stored
+        elif ConditionExpression == "attribute_not_exists(counterVersion)":
+            ok = "counterVersion" not in stored
+        elif ConditionExpression == "counterVersion = :v":
+            ok = stored.get("counterVersion") == ExpressionAttributeValues[":v"]
+        else:
+            ok = ConditionExpression is None
+        if not ok:
+            raise ConditionalCheckFailedException()
+        self.items[Item[self.key]] = Item
+        return {}
+
+    def add(self, attr, delta):
+        """An ingestion counter update: ADD the delta and bump counterVersion."""
+        item = self.items["dashboard"]
+        item[attr] = item.get(attr, 0) + delta
+        item["counterVersion"] = item.get("counterVersion", 0) + 1
+
+
+class RacingDocsTable(FakeTable):
+    """DocumentsTable whose first `races` scans see an ingestion ADD land."""
+
+    def __init__(self, items, stats, races):
+        super().__init__(items)
+        self.stats = stats
+        self.races = races
+
+    def scan(self, Segment=0, TotalSegments=1, **kwargs):
+        if self.races:
+            self.races -= 1
+            self.stats.add("agreement_types#NDA", 1)
+        return super().scan(Segment, TotalSegments, **kwargs)
+
+
+class FakeSettings:
+    docs_bucket = "bucket"
+    scan_segments = 2
+    scan_max_workers = 2
+
+
+def _svc(docs, stats):
+    return DocumentService(
+        aws_clients={"s3": None, "docs_table": docs, "stats_table": stats},
+        settings=FakeSettings(),
+    )
+
+
+DOCS = [
+    {"documentId": "1", "metadata": {"agreement_type": "NDA", "governing_law": "UK"}},
+    {"documentId": "2", "metadata": {"agreement_type": "NDA", "industry": "Retail"}},
+]
+
+
+# ---------- tests ----------
+
+
+def test_dashboard_seeds_stats_from_scan_once():
+    docs, stats = FakeTable(DOCS), FakeStatsTable()
+
+    first = asyncio.run(_svc(docs, stats).get_dashboard_data())
+    second = asyncio.run(_svc(docs, stats).get_dashboard_data())
+
+    assert first == second
+    assert first["agreement_types"] == {"NDA": 2}
+    assert first["jurisdictions"] == {"UK": 1}
+    assert docs.scans == 2  # one page per segment; second call is a single read
+
+
+def test_dashboard_reads_ingestion_counters():
+    stats = FakeStatsTable(
+        [
+            {
+                "statId": "dashboard",
+                "agreement_types#MSA": Decimal(3),
+                "agreement_types#NDA": Decimal(0),  # fully decremented
+                "industries#Finance": Decimal(1),
+            }
+        ]
+    )
+    docs = FakeTable(DOCS)
+
+    data = asyncio.run(_svc(docs, stats).get_dashboard_data())
+
+    assert data == {
+        "ok": True,
+        "agreement_types": {"MSA": 3},
+        "jurisdictions": {},
+        "industries": {"Finance": 1},
+    }
+    assert docs.scans == 0
+
+
+def test_reconcile_replaces_drifted_counters():
+    stats = FakeStatsTable(
+        [
+            {
+                "statId": "dashboard",
+                # an ADD lost while the seed scan ran, and a stale value
+                "agreement_types#NDA": Decimal(1),
+                "industries#Finance": Decimal(4),
+                "reconciledAt": Decimal(int(time.time()) - 7200),
+            }
+        ]
+    )
+    docs = FakeTable(DOCS)
+
+    assert asyncio.run(reconcile_dashboard_stats(docs, stats, min_age=3600)) is True
+    data = asyncio.run(_svc(docs, stats).get_dashboard_data())
+
+    assert data["agreement_types"] == {"NDA": 2}
+    assert data["industries"] == {"Retail": 1}
+
+
+def test_reconcile_skips_when_another_instance_just_ran():
+    stats, docs = FakeStatsTable(), FakeTable(DOCS)
+    asyncio.run(_svc(docs, stats).get_dashboard_data())  # seeds, stamped now
+    scans = docs.scans
+
+    assert asyncio.run(reconcile_dashboard_stats(docs, stats, min_age=3600)) is False
+    assert docs.scans == scans
+
+
+def _drifted_stats():
+    return FakeStatsTable(
+        [
+            {
+                "statId": "dashboard",
+                "agreement_types#NDA": Decimal(5),
+                "counterVersion": Decimal(7),
+                "reconciledAt": Decimal(int(time.time()) - 7200),
+            }
+        ]
+    )
+
+
+def test_reconcile_rescans_when_counters_change_during_the_scan():
+    stats = _drifted_stats()
+    docs = RacingDocsTable(DOCS, stats, races=1)
+
+    assert asyncio.run(reconcile_dashboard_stats(docs, stats, min_age=3600)) is True
+
+    item = stats.items["dashboard"]
+    assert docs.scans == 2
+    assert item["agreement_types#NDA"] == 2
+    assert item["counterVersion"] == 8  # kept, so later ADDs still bump it
+
+
+def test_reconcile_gives_up_while_counters_keep_changing():
+    stats = _drifted_stats()
+    docs = RacingDocsTable(DOCS, stats, races=100)
+
+    assert asyncio.run(reconcile_dashboard_stats(docs, stats, min_age=3600)) is False
+
+    item = stats.items["dashboard"]
+    assert docs.scans == RECONCILE_MAX_ATTEMPTS
+    assert item["agreement_types#NDA"] == 5 + RECONCILE_MAX_ATTEMPTS  # no ADD lost
@@ -0,0 +1,176 @@
+import asyncio
+import time
+
+import pytest
+
+from docapi import index as index_mod
+from docapi.filters import matches
+from docapi.index import (
+    CHANGE_INDEX,
+    MetadataIndex,
+    refresh_index_delta,
+    run_index_refresher,
+)
+
+
+# ---------- helpers ----------
+
+
+def _item(doc_id, key, **meta):
+    return {"documentId": doc_id, "s3Key": key, "metadata": meta}
+
+
+ITEMS = [
+    _item("1", "a.pdf", agreement_type="NDA", governing_law="UK", industry="Finance"),
+    _item("2", "b.pdf", agreement_type="MSA", governing_law="US", industry="Technology"),
+    _item("3", "c.pdf", agreement_type="NDA", governing_law="AE", industry="Retail"),
+    _item("4", "d.pdf", agreement_type="Employment", governing_law="", industry=""),
+]
+
+
+def _scan_docs(filters):
+    return sorted(
+        i["s3Key"] for i in ITEMS if matches(i.get("metadata", {}), filters)
+    )
+
+
+def _index_docs(index, filters):
+    return [r["document"] for r in index.lookup(filters)]
+
+
+class FakeChangeTable:
+    """Answers byUpdatedAt queries: updatedDay = :day AND updatedAt >= :since."""
+
+    def __init__(self, items):
+        self.items = items
+        self.days = []
+
+    def query(self, IndexName, KeyConditionExpression, **kwargs):
+        assert IndexName == CHANGE_INDEX
+        day_cond, since_cond = KeyConditionExpression._values
+        day, since = day_cond._values[1], since_cond._values[1]
+        self.days.append(day)
+        return {
+            "Items": [
+                i
+                for i in self.items
+                if i.get("updatedDay") == day and i.get("updatedAt") >= since
+            ]
+        }
+
+
+def _stamped(item, ts):
+    at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts))
+    return {**item, "updatedAt": at, "updatedDay": at[:10]}
+
+
+# ---------- tests ----------
+
+
+def test_lookup_matches_scan_semantics():
+    index = MetadataIndex()
+    index.sync(ITEMS)
+    assert index.ready is True
+
+    for filters in (
+        {"agreement_type": "NDA"},
+        {"agreement_type": "nda", "governing_law": "UK"},
+        {"governing_law": "UAE"},  # canon on the stored side: AE -> UAE
+        {"industry": "Tech"},  # prefix match
+        {"agreement_type": "MSA", "industry": "Finance"},
+    ):
+        assert _index_docs(index, filters) == _scan_docs(filters), filters
+
+
+def test_upsert_moves_postings():
+    index = MetadataIndex()
+    index.sync(ITEMS)
+
+    index.upsert(_item("1", "a.pdf", agreement_type="MSA", governing_law="UK"))
+    assert _index_docs(index, {"agreement_type": "NDA"}) == ["c.pdf"]
+    assert _index_docs(index, {"agreement_type": "MSA"}) == ["a.pdf", "b.pdf"]
+
+
+def test_sync_drops_vanished_documents():
+    index = MetadataIndex()
+    index.sync(ITEMS)
+    index.sync(ITEMS[1:])
+
+    assert len(index) == 3
+    assert _index_docs(index, {"governing_law": "UK"}) == []
+
+
+def test_unknown_field_falls_back():
+    index = MetadataIndex()
+    index.sync(ITEMS)
+    assert index.lookup({"title": "x"}) is None
+
+
+def test_delta_refresh_applies_only_recent_changes():
+    index = MetadataIndex()
+    index.sync(ITEMS)
+    now = time.time()
+    table = FakeChangeTable(
+        [
+            _stamped(_item("1", "a.pdf", agreement_type="MSA"), now - 5),
+            _stamped(_item("5", "e.pdf", agreement_type="NDA"), now - 30),
+            # older than the previous refresh (minus the overlap): not re-read
+            _stamped(_item("2", "b.pdf", agreement_type="NDA"), now - 3 * 86400),
+        ]
+    )
+
+    assert asyncio.run(refresh_index_delta(index, table, since=now - 60)) == 2
+    assert _index_docs(index, {"agreement_type": "MSA"}) == ["a.pdf", "b.pdf"]
+    assert _index_docs(index, {"agreement_type": "NDA"}) == ["c.pdf", "e.pdf"]
+
+
+def test_delta_refresh_queries_every_day_since_last_refresh():
+    table = FakeChangeTable([])
+    asyncio.run(refresh_index_delta(MetadataIndex(), table, since=time.time() - 2 * 86400))
+    assert len(table.days) in (3, 4)  # the overlap can reach one more day back
+    assert table.days == sorted(table.days)
+
+
+class _StopLoop(Exception):
+    pass
+
+
+def _drive_refresher(monkeypatch, rounds, **kwargs):
+    """Run the refresher for `rounds` passes; returns (kind, sleep) per pass."""
+    passes, sleeps = [], []
+    clock = [1_000_000.0]
+
+    async def full(index, table, segments, max_workers):
+        passes.append("full")
+
+    async def delta(index, table, since):
+        passes.append("delta")
+        return 0
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+        if len(sleeps) >= rounds:
+            raise _StopLoop()
+
+    monkeypatch.setattr(index_mod, "refresh_index", full)
+    monkeypatch.setattr(index_mod, "refresh_index_delta", delta)
+    monkeypatch.setattr(index_mod.anyio, "sleep", sleep)
+    monkeypatch.setattr(index_mod.time, "time", lambda: clock[0])
+    with pytest.raises(_StopLoop):
+        asyncio.run(run_index_refresher(MetadataIndex(), object(), 60.0, **kwargs))
+    return passes, sleeps
+
+
+def test_refresher_without_deltas_rescans_every_interval(monkeypatch):
+    passes, sleeps = _drive_refresher(monkeypatch, 4, reconcile_interval=3600.0)
+    assert passes == ["full"] * 4
+    assert sleeps == [60.0] * 4
+
+
+def test_refresher_with_deltas_reconciles_on_its_own_schedule(monkeypatch):
+    passes, sleeps = _drive_refresher(
+        monkeypatch, 6, reconcile_interval=180.0, deltas=True
+    )
+    assert passes == ["full", "delta", "delta", "full", "delta", "delta"]
+    assert sleeps == [60.0] * 6
@@ -12,6 +12,13 @@ from docapi.services import DocumentService, QueryService
 class FakeSettings:
     docs_bucket_region = "eu-central-1"
     nlp_url = "http://nlp.local"
+    nlp_timeout_seconds = 5.0
+    nlp_max_connections = 10
+    nlp_max_keepalive_connections = 5
+    nlp_keepalive_expiry_seconds = 30.0
+    nlp_http2 = False
+    metadata_index_enabled = False
+    dashboard_reconcile_seconds = 0.0
 
 
 class MockDocumentService:
@@ -126,3 +133,11 @@ def test_dashboard(client):
     data = r.json()
     assert data["ok"] is True
     assert data["agreement_types"]["NDA"] == 2
+
+
+def test_lifespan_shares_one_http_client():
+    with TestClient(app) as c:
+        shared = app.state.http_client
+        assert c.get("/health").status_code == 200
+        assert app.state.http_client is shared
+    assert shared.is_closed
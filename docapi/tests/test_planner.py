@@ -0,0 +1,63 @@
+import asyncio
+
+from docapi.planner import choose_index, facet_counts, query_with_index
+
+
+# ---------- helpers / fakes ----------
+
+
+class FakeIndexedTable:
+    def __init__(self, items):
+        self.items = items
+        self.queries = []
+
+    def query(self, IndexName, KeyConditionExpression, **kwargs):
+        key, value = KeyConditionExpression._values  # Key(attr).eq(value)
+        attr = key.name
+        self.queries.append((IndexName, attr, value))
+        return {"Items": [i for i in self.items if i.get(attr) == value]}
+
+
+ITEMS = [
+    {
+        "s3Key": "a.pdf",
+        "agreementType": "NDA",
+        "governingLaw": "UK",
+        "metadata": {"agreement_type": "NDA", "governing_law": "UK"},
+    },
+    {
+        "s3Key": "b.pdf",
+        "agreementType": "NDA",
+        "governingLaw": "US",
+        "metadata": {"agreement_type": "NDA", "governing_law": "US"},
+    },
+]
+
+
+# ---------- tests ----------
+
+
+def test_choose_index_prefers_smallest_partition():
+    counts = facet_counts(
+        {"agreement_types": {"NDA": 500}, "jurisdictions": {"AE": 3, "UK": 40}}
+    )
+    filters = {"agreement_type": "NDA", "governing_law": "UAE"}
+
+    assert counts["governing_law"]["UAE"] == 3
+    assert choose_index(filters, counts) == ("governing_law", "UAE")
+    assert choose_index(filters) == ("agreement_type", "NDA")
+
+
+def test_choose_index_skips_non_canonical_values():
+    assert choose_index({"industry": "Techno"}) is None  # partial, needs a scan
+    assert choose_index({"industry": "tech"}) == ("industry", "Technology")
+
+
+def test_query_with_index_applies_remaining_predicates():
+    table = FakeIndexedTable(ITEMS)
+    filters = {"agreement_type": "NDA", "governing_law": "US"}
+
+    items = asyncio.run(query_with_index(table, filters, {"governing_law": {"US": 1}}))
+
+    assert [i["s3Key"] for i in items] == ["b.pdf"]
+    assert table.queries == [("byGoverningLaw", "governingLaw", "US")]
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+
+from docapi.utils import projection_kwargs, scan_table_paginated
+
+
+# ---------- helpers / fakes ----------
+
+
+class FakePagedTable:
+    """Every segment returns `pages` single-item pages."""
+
+    def __init__(self, pages=3):
+        self.pages = pages
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def scan(self, Segment=0, TotalSegments=1, ExclusiveStartKey=None, **kwargs):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.01)
+        with self.lock:
+            self.in_flight -= 1
+        self.kwargs = kwargs
+        page = ExclusiveStartKey or 0
+        resp = {"Items": [{"segment": Segment, "page": page}]}
+        if page + 1 < self.pages:
+            resp["LastEvaluatedKey"] = page + 1
+        return resp
+
+
+def _collect(**kwargs):
+    async def _run():
+        pages = []
+        async for page in scan_table_paginated(**kwargs):
+            pages.append(page)
+        return pages
+
+    return asyncio.run(_run())
+
+
+# ---------- tests ----------
+
+
+def test_scan_yields_pages_with_projection():
+    table = FakePagedTable(pages=3)
+
+    pages = _collect(table=table, projection=["s3Key", "metadata.industry"])
+
+    assert [p[0]["page"] for p in pages] == [0, 1, 2]
+    assert table.kwargs == {
+        "ProjectionExpression": "#p0, #p1.#p2",
+        "ExpressionAttributeNames": {"#p0": "s3Key", "#p1": "metadata", "#p2": "industry"},
+    }
+
+
+def test_projection_reuses_placeholders():
+    kwargs = projection_kwargs(["metadata.a", "metadata.b"])
+    assert kwargs["ProjectionExpression"] == "#p0.#p1, #p0.#p2"
+
+
+def test_segmented_scan_reads_every_page_with_bounded_workers():
+    table = FakePagedTable(pages=3)
+
+    items = [i for page in _collect(table=table, segments=6, max_workers=2) for i in page]
+
+    assert sorted((i["segment"], i["page"]) for i in items) == [
+        (s, p) for s in range(6) for p in range(3)
+    ]
+    assert table.max_in_flight <= 2
+
+
+def test_segmented_scan_stops_at_limit():
+    table = FakePagedTable(pages=5)
+
+    pages = _collect(table=table, limit=3, segments=4)
+
+    assert sum(len(p) for p in pages) == 3
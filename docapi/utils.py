@@ -1,6 +1,9 @@
 # app/utils.py
+import asyncio
 import re
-from typing import List, Dict, Any, Optional
+from contextlib import aclosing
+from typing import List, Dict, Any, Optional, AsyncIterator, Sequence
+import anyio
 from anyio import to_thread
 
 
@@ -10,37 +13,136 @@ def sanitize_filename(name: Optional[str]) -> str:
     return "".join(c for c in name if c.isalnum() or c in ("-", "_", ".", " "))[:200]
 
 
-async def _scan_once(table, **kwargs) -> Dict[str, Any]:
+async def run_table_call(fn, **kwargs) -> Dict[str, Any]:
+    # boto3 is sync; run any table operation in a worker thread
+    return await to_thread.run_sync(lambda: fn(**kwargs))
+
+
+async def _scan_once(table, limiter=None, **kwargs) -> Dict[str, Any]:
     # boto3 is sync; run in a worker thread
     def _call():
         return table.scan(**kwargs)
 
-    return await to_thread.run_sync(_call)
+    return await to_thread.run_sync(_call, limiter=limiter)
+
+
+def projection_kwargs(paths: Optional[Sequence[str]]) -> Dict[str, Any]:
+    """
+    ProjectionExpression kwargs for attribute paths such as "metadata.industry";
+    every path segment goes through a placeholder so reserved words are safe.
+    """
+    if not paths:
+        return {}
+    names: Dict[str, str] = {}
+    placeholders: Dict[str, str] = {}
+    exprs = []
+    for path in paths:
+        parts = []
+        for part in path.split("."):
+            if part not in placeholders:
+                placeholders[part] = f"#p{len(placeholders)}"
+                names[placeholders[part]] = part
+            parts.append(placeholders[part])
+        exprs.append(".".join(parts))
+    return {"ProjectionExpression": ", ".join(exprs), "ExpressionAttributeNames": names}
+
+
+async def iter_scan_segments(
+    table,
+    total_segments: int,
+    max_workers: Optional[int] = None,
+    **scan_kwargs,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Parallel scan using DynamoDB's Segment/TotalSegments. Each segment pages
+    independently; at most `max_workers` scan calls are in flight, and pages
+    are yielded in completion order.
+    """
+    limiter = anyio.CapacityLimiter(max_workers or total_segments)
+
+    def _next_page(segment: int, start_key=None) -> asyncio.Task:
+        kwargs = {**scan_kwargs, "Segment": segment, "TotalSegments": total_segments}
+        if start_key:
+            kwargs["ExclusiveStartKey"] = start_key
+        return asyncio.ensure_future(_scan_once(table, limiter=limiter, **kwargs))
+
+    pending = {_next_page(segment): segment for segment in range(total_segments)}
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                segment = pending.pop(task)
+                resp = task.result()
+                start_key = resp.get("LastEvaluatedKey")
+                if start_key:
+                    pending[_next_page(segment, start_key)] = segment
+                yield resp.get("Items", [])
+    finally:
+        for task in pending:  # consumer stopped early
+            task.cancel()
+
+
+async def _iter_scan_sequential(table, **scan_kwargs) -> AsyncIterator[List[Dict[str, Any]]]:
+    start_key = None
+    while True:
+        kwargs = dict(scan_kwargs)
+        if start_key:
+            kwargs["ExclusiveStartKey"] = start_key
+        resp = await _scan_once(table, **kwargs)
+        yield resp.get("Items", [])
+
+        start_key = resp.get("LastEvaluatedKey")
+        if not start_key:
+            break
 
 
 async def scan_table_paginated(
-    table, limit: Optional[int] = None
-) -> List[Dict[str, Any]]:
+    table,
+    limit: Optional[int] = None,
+    segments: int = 1,
+    max_workers: Optional[int] = None,
+    projection: Optional[Sequence[str]] = None,
+) -> AsyncIterator[List[Dict[str, Any]]]:
     """
-    Asynchronously scan a DynamoDB table with pagination.
-    If `limit` is provided, returns up to that many items.
+    Asynchronously scan a DynamoDB table, yielding one page of items at a time.
+    If `limit` is provided, stops after that many items.
+    With `segments` > 1 the table is read as a parallel segmented scan.
+    `projection` limits the attribute paths DynamoDB returns.
     """
     if not table:
-        return []
+        return
+
+    scan_kwargs = projection_kwargs(projection)
+    if segments > 1:
+        pages = iter_scan_segments(table, segments, max_workers, **scan_kwargs)
+    else:
+        pages = _iter_scan_sequential(table, **scan_kwargs)
+
+    remaining = limit
+    async with aclosing(pages):
+        async for page in pages:
+            if remaining is not None:
+                page = page[:remaining]
+                remaining -= len(page)
+            if page:
+                yield page
+            if remaining is not None and remaining <= 0:
+                return
+
 
+async def query_table_paginated(table, **query_kwargs) -> List[Dict[str, Any]]:
+    """
+    Asynchronously run a DynamoDB Query (table or GSI) through all pages.
+    """
     items: List[Dict[str, Any]] = []
     start_key = None
 
     while True:
-        kwargs = {}
+        kwargs = dict(query_kwargs)
         if start_key:
             kwargs["ExclusiveStartKey"] = start_key
-        resp = await _scan_once(table, **kwargs)
-        batch = resp.get("Items", [])
-        items.extend(batch)
-
-        if limit is not None and len(items) >= limit:
-            return items[:limit]
+        resp = await run_table_call(table.query, **kwargs)
+        items.extend(resp.get("Items", []))
 
         start_key = resp.get("LastEvaluatedKey")
         if not start_key:
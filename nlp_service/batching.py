@@ -0,0 +1,101 @@
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _fail(batch: List[Tuple[str, asyncio.Future]], error: BaseException) -> None:
+    for _, fut in batch:
+        if not fut.done():
+            fut.set_exception(error)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-document requests into one batch call.
+
+    The first queued request opens a window of `max_wait_ms`; whatever
+    arrives before it closes (up to `max_batch_size`) runs through
+    `run_batch` together in a worker thread, and each caller gets its own
+    result back. Requests that arrive while a batch is running form the
+    next one.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[str]], List[Dict]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+    ):
+        self._run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "asyncio.Queue[Tuple[str, asyncio.Future]]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        queued = []
+        while not self._queue.empty():
+            queued.append(self._queue.get_nowait())
+        _fail(queued, RuntimeError("batcher stopped"))
+
+    async def submit(self, text: str) -> Dict:
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, fut))
+        return await fut
+
+    async def _collect(self) -> List[Tuple[str, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        try:
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+        except asyncio.CancelledError:  # stopped while the window was open
+            _fail(batch, RuntimeError("batcher stopped"))
+            raise
+        return batch
+
+    async def _loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # callers that disconnected while queued don't need a slot
+            batch = [(t, f) for t, f in batch if not f.done()]
+            if not batch:
+                continue
+            try:
+                results = await loop.run_in_executor(
+                    None, self._run_batch, [t for t, _ in batch]
+                )
+            except asyncio.CancelledError:  # stopped mid-batch
+                _fail(batch, RuntimeError("batcher stopped"))
+                raise
+            except Exception as e:
+                logger.exception("Batch of %d failed", len(batch))
+                _fail(batch, e)
+                continue
+            for (_, fut), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(result)
@@ -0,0 +1,136 @@
+"""
+Parity check and benchmark of an embedding backend against PyTorch.
+
+    python -m nlpapi.bench_embedder --model /app/models/embedder \\
+        --backend onnx --onnx-file onnx/model_qint8_avx2.onnx
+
+Each backend runs in a fresh process so load time and peak RSS are not
+mixed up. Exits non-zero when any document/label cosine differs from the
+PyTorch reference by more than --tolerance.
+"""
+import argparse
+import json
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from .labels import AGREEMENT_LABELS, INDUSTRY_LABELS
+
+DEFAULT_TOLERANCE = 0.05
+
+SAMPLE_TEXTS = [
+    "MUTUAL NON-DISCLOSURE AGREEMENT between Acme Corp and Globex Ltd. The "
+    "parties wish to protect confidential information exchanged in evaluating "
+    "a software partnership. This Agreement is governed by the laws of England.",
+    "MASTER SERVICES AGREEMENT. Provider shall deliver cloud hosting and SaaS "
+    "support services to Customer under Statements of Work issued hereunder.",
+    "STATEMENT OF WORK No. 4: scope, deliverables and milestones for the "
+    "migration of the payments platform, with acceptance criteria per phase.",
+    "DATA PROCESSING AGREEMENT. Processor shall process personal data only on "
+    "documented instructions of the Controller in accordance with the GDPR.",
+    "EMPLOYMENT AGREEMENT between Contoso Manufacturing GmbH and the Employee, "
+    "covering salary, working hours, notice periods and confidentiality.",
+    "Equipment lease for retail point-of-sale terminals, monthly rent payable "
+    "in advance, governed by the laws of the State of New York.",
+]
+
+
+def _label_prompts() -> List[str]:
+    labels = {**AGREEMENT_LABELS, **INDUSTRY_LABELS}
+    return [f"{k}: {v}" for k, v in labels.items()]
+
+
+def measure(
+    model: str,
+    backend: str = "torch",
+    onnx_file: str = "",
+    texts: Optional[List[str]] = None,
+    runs: int = 20,
+) -> Dict:
+    """Load one backend, time document encoding and return label cosines."""
+    t0 = time.perf_counter()
+    from sentence_transformers import SentenceTransformer
+
+    kwargs = {}
+    if backend != "torch":
+        kwargs["backend"] = backend
+        if onnx_file:
+            kwargs["model_kwargs"] = {"file_name": onnx_file}
+    embedder = SentenceTransformer(model, **kwargs)
+    load_s = time.perf_counter() - t0
+
+    texts = texts or SAMPLE_TEXTS
+    labels = embedder.encode(_label_prompts(), normalize_embeddings=True)
+    docs = embedder.encode(texts, normalize_embeddings=True)  # warm-up
+
+    timings = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        docs = embedder.encode(texts, normalize_embeddings=True)
+        timings.append((time.perf_counter() - t0) * 1000)
+
+    return {
+        "backend": backend,
+        "onnx_file": onnx_file,
+        "load_s": round(load_s, 2),
+        "encode_ms_p50": round(statistics.median(timings), 2),
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+        "scores": (docs @ labels.T).tolist(),
+    }
+
+
+def _measure_isolated(**kwargs) -> Dict:
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+        return pool.submit(measure, **kwargs).result()
+
+
+def compare_backends(
+    model: str,
+    backend: str,
+    onnx_file: str = "",
+    texts: Optional[List[str]] = None,
+    runs: int = 20,
+) -> Dict:
+    reference = _measure_isolated(model=model, texts=texts, runs=runs)
+    candidate = _measure_isolated(
+        model=model, backend=backend, onnx_file=onnx_file, texts=texts, runs=runs
+    )
+    ref, cand = reference.pop("scores"), candidate.pop("scores")
+    max_abs_diff = max(
+        abs(a - b)
+        for ref_row, cand_row in zip(ref, cand)
+        for a, b in zip(ref_row, cand_row)
+    )
+    return {
+        "reference": reference,
+        "candidate": candidate,
+        "max_abs_cosine_diff": round(max_abs_diff, 5),
+        "speedup": round(reference["encode_ms_p50"] / candidate["encode_ms_p50"], 2),
+        "rss_saved_mb": round(reference["peak_rss_mb"] - candidate["peak_rss_mb"], 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", required=True)
+    parser.add_argument("--backend", default="onnx")
+    parser.add_argument("--onnx-file", default="")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    report = compare_backends(args.model, args.backend, args.onnx_file, runs=args.runs)
+    print(json.dumps(report, indent=2))
+    if report["max_abs_cosine_diff"] > args.tolerance:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
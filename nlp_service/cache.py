@@ -0,0 +1,194 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .config import Settings
+from .labels import AGREEMENT_LABELS, INDUSTRY_LABELS, COUNTRY_HINTS
+
+logger = logging.getLogger(__name__)
+
+# settings that change what /analyze returns for the same text
+_RESULT_SETTINGS = (
+    "embed_model_name",
+    "embed_backend",
+    "embed_onnx_file",
+    "chunk_pooling",
+    "chunk_size_chars",
+    "chunk_overlap_chars",
+    "max_chunks",
+    "embed_max_chars",
+    "ner_max_chars",
+)
+
+
+def result_cache_version(settings: Settings) -> str:
+    """Fingerprint of the model, label set and analysis settings."""
+    payload = {
+        "settings": {name: getattr(settings, name) for name in _RESULT_SETTINGS},
+        "agreement_labels": AGREEMENT_LABELS,
+        "industry_labels": INDUSTRY_LABELS,
+        "country_hints": COUNTRY_HINTS,
+    }
+    raw = json.dumps(payload, sort_keys=True).encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()[:16]
+
+
+class DiskStore:
+    """SQLite table of results for one version; other versions are purged on open."""
+
+    def __init__(self, path: str, version: str, max_rows: int = 100_000):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.version = version
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results "
+            "(key TEXT PRIMARY KEY, version TEXT NOT NULL, value TEXT NOT NULL)"
+        )
+        with self._db:
+            self._db.execute("DELETE FROM results WHERE version != ?", (version,))
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM results WHERE key = ? AND version = ?",
+                (key, self.version),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Dict) -> None:
+        self.set_many([(key, value)])
+
+    def set_many(self, items: Sequence[Tuple[str, Dict]]) -> None:
+        """Store several results in one transaction."""
+        rows = [(key, self.version, json.dumps(value)) for key, value in items]
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO results (key, version, value) VALUES (?, ?, ?)",
+                rows,
+            )
+            # oldest rows first: rowid grows with every insert/replace
+            self._db.execute(
+                "DELETE FROM results WHERE rowid <= "
+                "(SELECT MAX(rowid) FROM results) - ?",
+                (self.max_rows,),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class ResultCache:
+    """
+    Analysis results keyed by a hash of the input text, bounded LRU in
+    memory with an optional on-disk copy that survives restarts.
+
+    Keys include `version`, so editing labels.py or switching the model
+    makes every earlier entry unreachable.
+    """
+
+    def __init__(self, version: str, max_size: int = 2048, disk: Optional[DiskStore] = None):
+        self.version = version
+        self.max_size = max_size
+        self.disk = disk
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def key(self, text: str) -> str:
+        h = hashlib.sha256(self.version.encode("utf-8"))
+        h.update(b"\0")
+        h.update(text.encode("utf-8"))
+        return h.hexdigest()
+
+    def _remember(self, key: str, value: Dict) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def get(self, text: str) -> Optional[Dict]:
+        key = self.key(text)
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+        if value is None and self.disk is not None:
+            try:
+                value = self.disk.get(key)
+            except sqlite3.Error as e:  # a broken cache must not fail analysis
+                logger.warning("Result cache read failed: %s", e)
+            if value is not None:
+                self._remember(key, value)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, text: str, value: Dict) -> None:
+        key = self.key(text)
+        self._remember(key, value)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value)
+            except sqlite3.Error as e:
+                logger.warning("Result cache write failed: %s", e)
+
+    # blocking (hashing, SQLite); async callers run these in a worker thread
+    def get_many(self, texts: Sequence[str]) -> List[Optional[Dict]]:
+        return [self.get(t) for t in texts]
+
+    def set_many(self, items: Sequence[Tuple[str, Dict]]) -> None:
+        keyed = [(self.key(text), value) for text, value in items]
+        for key, value in keyed:
+            self._remember(key, value)
+        if self.disk is not None and keyed:
+            try:
+                self.disk.set_many(keyed)
+            except sqlite3.Error as e:
+                logger.warning("Result cache write failed: %s", e)
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+
+    def stats(self) -> Dict:
+        return {
+            "version": self.version,
+            "size": len(self),
+            "disk": self.disk is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def build_result_cache(settings: Settings) -> Optional[ResultCache]:
+    if settings.result_cache_size <= 0:
+        return None
+    version = result_cache_version(settings)
+    disk = None
+    if settings.result_cache_dir:
+        try:
+            disk = DiskStore(
+                os.path.join(settings.result_cache_dir, "results.sqlite"),
+                version,
+                max_rows=settings.result_cache_disk_rows,
+            )
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("Result cache disk store unavailable, memory only: %s", e)
+    return ResultCache(version, settings.result_cache_size, disk)
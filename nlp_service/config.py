@@ -8,6 +8,48 @@ class Settings(BaseSettings):
         default="sentence-transformers/paraphrase-MiniLM-L6-v2",
         env="EMBED_MODEL_NAME",
     )
+    # inference backend: "torch" | "onnx" | "openvino"; for ONNX point
+    # embed_onnx_file at a quantized export, e.g. "onnx/model_qint8_avx2.onnx"
+    # (see export_onnx.py)
+    embed_backend: str = Field(default="torch", env="EMBED_BACKEND")
+    embed_onnx_file: str = Field(default="", env="EMBED_ONNX_FILE")
+
+    # long documents: embed up to `max_chunks` windows spread over the whole
+    # text and pool label similarities ("max" | "mean"); "off" embeds only
+    # the first `embed_max_chars`. The encoder truncates each input to its
+    # max_seq_length (128 tokens for MiniLM), so chunks stay short.
+    chunk_pooling: str = Field(default="max", env="CHUNK_POOLING")
+    chunk_size_chars: int = Field(default=600, env="CHUNK_SIZE_CHARS")
+    chunk_overlap_chars: int = Field(default=100, env="CHUNK_OVERLAP_CHARS")
+    max_chunks: int = Field(default=8, env="MAX_CHUNKS")
+    embed_max_chars: int = Field(default=5000, env="EMBED_MAX_CHARS")
+    ner_max_chars: int = Field(default=8000, env="NER_MAX_CHARS")
+
+    # batch analysis
+    embed_batch_size: int = Field(default=32, env="EMBED_BATCH_SIZE")
+    ner_batch_size: int = Field(default=16, env="NER_BATCH_SIZE")
+    max_batch_texts: int = Field(default=64, env="MAX_BATCH_TEXTS")
+
+    # micro-batching of concurrent single /analyze requests
+    batching_enabled: bool = Field(default=True, env="BATCHING_ENABLED")
+    batch_max_size: int = Field(default=16, env="BATCH_MAX_SIZE")
+    batch_max_wait_ms: float = Field(default=5.0, env="BATCH_MAX_WAIT_MS")
+
+    # process-pool mode: analysis runs in this many pre-warmed worker
+    # processes (about one per vCPU, each holding its own models); 0 keeps
+    # it in-process. Requests beyond worker_queue_size in flight get a 503.
+    worker_processes: int = Field(default=0, env="WORKER_PROCESSES")
+    worker_queue_size: int = Field(default=32, env="WORKER_QUEUE_SIZE")
+    worker_start_timeout_seconds: float = Field(
+        default=300.0, env="WORKER_START_TIMEOUT_SECONDS"
+    )
+
+    # content-hash cache of /analyze results; entries are keyed by the model,
+    # label set and the analysis settings above. result_cache_dir keeps a
+    # SQLite copy that survives restarts.
+    result_cache_size: int = Field(default=2048, env="RESULT_CACHE_SIZE")
+    result_cache_dir: str = Field(default="", env="RESULT_CACHE_DIR")
+    result_cache_disk_rows: int = Field(default=100_000, env="RESULT_CACHE_DISK_ROWS")
 
     model_config = SettingsConfigDict(case_sensitive=False, extra="ignore")
 
@@ -1,23 +1,49 @@
 from functools import lru_cache
-from typing import Tuple, List
+from typing import TYPE_CHECKING, Tuple, List
 import numpy as np
-import spacy
-from sentence_transformers import SentenceTransformer
 
 from .config import get_settings
 
+# spaCy and sentence-transformers (torch) take seconds to import; load them
+# with the models rather than with the app
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+# pipeline components whose output the extractors read (doc.ents)
+NER_PIPES = ("ner",)
+
 
 @lru_cache()
 def get_nlp():
-    # lightweight English model
-    return spacy.load("en_core_web_sm")
+    import spacy
+
+    # lightweight English model, trimmed to what NER needs
+    nlp = spacy.load("en_core_web_sm")
+    needed = set(NER_PIPES)
+    for name, pipe in nlp.pipeline:
+        # keep shared embedding layers that NER listens to
+        if set(getattr(pipe, "listening_components", ())) & needed:
+            needed.add(name)
+    for name in nlp.pipe_names:
+        if name not in needed:
+            nlp.disable_pipe(name)
+    return nlp
 
 
 @lru_cache()
-def get_embedder() -> SentenceTransformer:
+def get_embedder() -> "SentenceTransformer":
+    from sentence_transformers import SentenceTransformer
+
     settings = get_settings()
-    return SentenceTransformer(settings.embed_model_name)
+    kwargs = {}
+    if settings.embed_backend != "torch":
+        kwargs["backend"] = settings.embed_backend
+        if settings.embed_onnx_file:
+            kwargs["model_kwargs"] = {"file_name": settings.embed_onnx_file}
+    return SentenceTransformer(settings.embed_model_name, **kwargs)
 
 
-def encode_norm(embedder: SentenceTransformer, texts: List[str]) -> np.ndarray:
-    return embedder.encode(texts, normalize_embeddings=True)
+def encode_norm(
+    embedder: "SentenceTransformer", texts: List[str], batch_size: int = 32
+) -> np.ndarray:
+    return embedder.encode(texts, batch_size=batch_size, normalize_embeddings=True)
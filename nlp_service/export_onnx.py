@@ -0,0 +1,44 @@
+"""
+Export the embedding model to ONNX with int8 dynamic quantization.
+
+    python -m nlpapi.export_onnx --out /app/models/embedder --quantization avx2
+
+Then run the service with
+    EMBED_MODEL_NAME=/app/models/embedder EMBED_BACKEND=onnx
+    EMBED_ONNX_FILE=onnx/model_qint8_avx2.onnx
+"""
+import argparse
+import os
+
+from sentence_transformers import (
+    SentenceTransformer,
+    export_dynamic_quantized_onnx_model,
+)
+
+from .config import get_settings
+
+
+def export(model_name: str, out_dir: str, quantization: str) -> str:
+    model = SentenceTransformer(model_name, backend="onnx")
+    model.save(out_dir)
+    export_dynamic_quantized_onnx_model(model, quantization, out_dir)
+    return os.path.join("onnx", f"model_qint8_{quantization}.onnx")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default=get_settings().embed_model_name)
+    parser.add_argument("--out", required=True, help="directory to save the model in")
+    parser.add_argument(
+        "--quantization",
+        default="avx2",
+        choices=["arm64", "avx2", "avx512", "avx512_vnni"],
+        help="target CPU instruction set for the int8 kernels",
+    )
+    args = parser.parse_args()
+    onnx_file = export(args.model, args.out, args.quantization)
+    print(f"EMBED_MODEL_NAME={args.out} EMBED_BACKEND=onnx EMBED_ONNX_FILE={onnx_file}")
+
+
+if __name__ == "__main__":
+    main()
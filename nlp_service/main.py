@@ -1,19 +1,164 @@
-from fastapi import FastAPI
+import time
+
+_IMPORT_T0 = time.perf_counter()
+
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from .batching import MicroBatcher
+from .cache import build_result_cache
 from .config import get_settings
-from .models import AnalyzeIn, AnalyzeOut
+from .middleware import GzipRequestMiddleware
+from .models import AnalyzeIn, AnalyzeOut, AnalyzeBatchIn, AnalyzeBatchOut
 from .services import AnalyzerService
+from .warmup import ModelLoader
+from .workers import PoolBusy, WorkerPool
+
+IMPORT_SECONDS = round(time.perf_counter() - _IMPORT_T0, 3)
+
+
+def _build_loader() -> ModelLoader:
+    s = get_settings()
+    if s.worker_processes > 0:
+        return ModelLoader(
+            lambda: WorkerPool(
+                s.worker_processes,
+                max_pending=s.worker_queue_size,
+                start_timeout=s.worker_start_timeout_seconds,
+            ),
+            preload_models=False,
+        )
+    return ModelLoader(AnalyzerService)
+
+
+# models load in the background once the server is up; see /health/ready
+loader = _build_loader()
+batcher = None
+result_cache = None
+
+
+def _service() -> AnalyzerService:
+    if not loader.ready:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Models are loading ({loader.phase})",
+            headers={"Retry-After": "5"},
+        )
+    return loader.service
+
+
+def _run_batch(texts):
+    return loader.service.analyze_batch(texts)
+
 
-app = FastAPI()
-svc = AnalyzerService()  # single instance; models are cached in dependencies
+async def _run_in_pool(pool: WorkerPool, texts):
+    try:
+        return await pool.submit(texts)
+    except PoolBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Analysis queue is full",
+            headers={"Retry-After": "1"},
+        )
+    except BrokenProcessPool:
+        raise HTTPException(
+            status_code=503,
+            detail="Analysis workers are restarting",
+            headers={"Retry-After": "5"},
+        )
+
+
+async def _run(texts):
+    svc = _service()
+    if isinstance(svc, WorkerPool):
+        return await _run_in_pool(svc, texts)
+    if batcher is not None and len(texts) == 1:
+        return [await batcher.submit(texts[0])]
+    return await run_in_threadpool(svc.analyze_batch, texts)
+
+
+async def _analyze_texts(texts):
+    """
+    Results in input order. Only texts missing from the result cache reach
+    the models, so cached documents are served even while they load.
+    """
+    cache = result_cache
+    if cache is None:
+        return await _run(texts)
+    # the disk store is SQLite, so cache I/O stays off the event loop
+    results = await run_in_threadpool(cache.get_many, texts)
+    todo = [i for i, r in enumerate(results) if r is None]
+    if todo:
+        fresh = await _run([texts[i] for i in todo])
+        for i, r in zip(todo, fresh):
+            results[i] = r
+        await run_in_threadpool(cache.set_many, [(texts[i], results[i]) for i in todo])
+    return results
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global batcher, result_cache
+    s = get_settings()
+    loader.timings["import_s"] = IMPORT_SECONDS
+    result_cache = build_result_cache(s)
+    loader.start()
+    # worker processes queue requests themselves; coalescing them into one
+    # batch would leave all but one worker idle
+    if s.batching_enabled and s.worker_processes <= 0:
+        batcher = MicroBatcher(
+            _run_batch,
+            max_batch_size=s.batch_max_size,
+            max_wait_ms=s.batch_max_wait_ms,
+        )
+        batcher.start()
+    yield
+    if batcher is not None:
+        await batcher.stop()
+        batcher = None
+    loader.close()
+    if result_cache is not None:
+        result_cache.close()
+        result_cache = None
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(GzipRequestMiddleware)
 
 
 @app.get("/health")
+@app.get("/health/live")
 def health():
+    # liveness: the process is serving; models may still be loading
     s = get_settings()
-    return {"ok": True, "embed_model": s.embed_model_name}
+    out = {"ok": True, "ready": loader.ready, "embed_model": s.embed_model_name}
+    if isinstance(loader.service, WorkerPool):
+        out["workers"] = loader.service.workers
+        out["pending"] = loader.service.pending
+        out["worker_restarts"] = loader.service.restarts
+    if result_cache is not None:
+        out["result_cache"] = result_cache.stats()
+    return out
+
+
+@app.get("/health/ready")
+def health_ready():
+    status = loader.status()
+    return JSONResponse(status, status_code=200 if loader.ready else 503)
 
 
 @app.post("/analyze", response_model=AnalyzeOut)
-def analyze(payload: AnalyzeIn):
-    result = svc.analyze(payload.text)
+async def analyze(payload: AnalyzeIn):
+    result = (await _analyze_texts([payload.text]))[0]
     return AnalyzeOut(**result)
+
+
+@app.post("/analyze/batch", response_model=AnalyzeBatchOut)
+async def analyze_batch(payload: AnalyzeBatchIn):
+    limit = get_settings().max_batch_texts
+    if len(payload.texts) > limit:
+        raise HTTPException(status_code=413, detail=f"At most {limit} texts per batch")
+    results = await _analyze_texts(payload.texts)  # same order as payload.texts
+    return AnalyzeBatchOut(results=[AnalyzeOut(**r) for r in results])
@@ -0,0 +1,68 @@
+import zlib
+
+from starlette.responses import PlainTextResponse
+
+
+class GzipRequestMiddleware:
+    """
+    Inflates request bodies sent with `Content-Encoding: gzip` before they
+    reach the routes (the ingestion Lambda compresses document text).
+    Bodies that inflate past `max_size` bytes are rejected with 413.
+    """
+
+    def __init__(self, app, max_size: int = 10 * 1024 * 1024):
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._is_gzip(scope):
+            await self.app(scope, receive, send)
+            return
+
+        chunks = []
+        more = True
+        while more:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            more = message.get("more_body", False)
+
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)  # gzip framing
+        try:
+            body = inflater.decompress(b"".join(chunks), self.max_size + 1)
+        except zlib.error:
+            await PlainTextResponse("Invalid gzip body", status_code=400)(scope, receive, send)
+            return
+        if len(body) > self.max_size or inflater.unconsumed_tail:
+            await PlainTextResponse("Request body too large", status_code=413)(
+                scope, receive, send
+            )
+            return
+        if not inflater.eof:  # truncated stream: no end marker or CRC check
+            await PlainTextResponse("Invalid gzip body", status_code=400)(scope, receive, send)
+            return
+
+        headers = [
+            (k, v)
+            for k, v in scope["headers"]
+            if k not in (b"content-encoding", b"content-length")
+        ]
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        sent = False
+
+        async def receive_inflated():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app(dict(scope, headers=headers), receive_inflated, send)
+
+    @staticmethod
+    def _is_gzip(scope) -> bool:
+        for k, v in scope["headers"]:
+            if k == b"content-encoding":
+                return v.strip().lower() == b"gzip"
+        return False
@@ -16,3 +16,11 @@ class AnalyzeOut(BaseModel):
     industry: Optional[str] = None
     industry_confidence: float = 0.0
     parties: List[str] = []
+
+
+class AnalyzeBatchIn(BaseModel):
+    texts: List[str]
+
+
+class AnalyzeBatchOut(BaseModel):
+    results: List[AnalyzeOut]
@@ -1,10 +1,15 @@
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, NamedTuple, Optional, Tuple
 import numpy as np
-from sentence_transformers import util
 
+from .config import get_settings
 from .dependencies import get_nlp, get_embedder, encode_norm
 from .labels import AGREEMENT_LABELS, INDUSTRY_LABELS, COUNTRY_HINTS
-from .utils import first_nonempty_line, first_date, norm
+from .utils import first_nonempty_line, first_date, norm, chunk_text
+
+
+class LabelMatrix(NamedTuple):
+    names: List[str]
+    embeddings: np.ndarray  # (n_labels, dim), L2-normalised, C-contiguous
 
 
 class AnalyzerService:
@@ -13,43 +18,104 @@ class AnalyzerService:
     def __init__(self):
         self._nlp = get_nlp()
         self._embedder = get_embedder()
+        # label prompts never change; encode them once per process
+        self._agreement_labels = self._encode_labels(AGREEMENT_LABELS)
+        self._industry_labels = self._encode_labels(INDUSTRY_LABELS)
 
     # ---- public API ----
     def analyze(self, text: str) -> Dict:
-        txt = text or ""
-        title = first_nonempty_line(txt) or None
-        eff_date = first_date(txt)
-
-        ag_type, ag_conf = self._best_label(txt, AGREEMENT_LABELS)
-        ind, ind_conf = self._best_label(txt, INDUSTRY_LABELS)
-        govlaw, gov_conf = self._governing_law(txt)
-        parties = self._extract_parties(txt)
-
-        return {
-            "title": title,
-            "effective_date": eff_date,
-            "governing_law": govlaw,
-            "governing_law_confidence": gov_conf,
-            "agreement_type": ag_type,
-            "agreement_type_confidence": ag_conf,
-            "industry": ind,
-            "industry_confidence": ind_conf,
-            "parties": parties,
-        }
+        return self.analyze_batch([text])[0]
+
+    def analyze_batch(self, texts: List[str]) -> List[Dict]:
+        """Analyze many documents with one encoder batch and one NER stream."""
+        txts = [t or "" for t in texts]
+        if not txts:
+            return []
+        settings = get_settings()
+
+        pooling = settings.chunk_pooling
+        if pooling in ("max", "mean"):
+            chunks = [
+                chunk_text(
+                    t,
+                    settings.chunk_size_chars,
+                    settings.chunk_overlap_chars,
+                    settings.max_chunks,
+                )
+                for t in txts
+            ]
+        else:
+            pooling = "max"  # one chunk per document; pooling is a no-op
+            chunks = [[t[: settings.embed_max_chars]] for t in txts]
+
+        # every chunk of every document in one encoder batch
+        chunk_embs = encode_norm(
+            self._embedder,
+            [c for doc_chunks in chunks for c in doc_chunks],
+            batch_size=settings.embed_batch_size,
+        )
+        offsets = np.cumsum([0] + [len(c) for c in chunks[:-1]])
+        agreements = self._best_labels(
+            chunk_embs, offsets, self._agreement_labels, pooling
+        )
+        industries = self._best_labels(
+            chunk_embs, offsets, self._industry_labels, pooling
+        )
+
+        # one NER pass per document, shared by every extractor
+        docs = self._nlp.pipe(
+            (t[: settings.ner_max_chars] for t in txts),
+            batch_size=settings.ner_batch_size,
+        )
+
+        results = []
+        for txt, doc, (ag_type, ag_conf), (ind, ind_conf) in zip(
+            txts, docs, agreements, industries
+        ):
+            govlaw, gov_conf = self._governing_law(txt, doc)
+            results.append(
+                {
+                    "title": first_nonempty_line(txt) or None,
+                    "effective_date": first_date(txt),
+                    "governing_law": govlaw,
+                    "governing_law_confidence": gov_conf,
+                    "agreement_type": ag_type,
+                    "agreement_type_confidence": ag_conf,
+                    "industry": ind,
+                    "industry_confidence": ind_conf,
+                    "parties": self._extract_parties(doc),
+                }
+            )
+        return results
 
     # ---- internals ----
-    def _best_label(
-        self, text: str, labels: Dict[str, str]
-    ) -> Tuple[Optional[str], float]:
-        doc = text[:5000]
-        doc_emb = encode_norm(self._embedder, [doc])
+    def _encode_labels(self, labels: Dict[str, str]) -> LabelMatrix:
         label_texts = [f"{k}: {v}" for k, v in labels.items()]
-        lab_embs = encode_norm(self._embedder, label_texts)
-        sims = util.cos_sim(doc_emb, lab_embs).cpu().numpy()[0]
-        idx = int(np.argmax(sims))
-        return list(labels.keys())[idx], float(sims[idx])
+        embs = encode_norm(self._embedder, label_texts)
+        return LabelMatrix(
+            list(labels.keys()), np.ascontiguousarray(embs, dtype=np.float32)
+        )
+
+    def _best_labels(
+        self,
+        chunk_embs: np.ndarray,
+        offsets: np.ndarray,
+        labels: LabelMatrix,
+        pooling: str = "max",
+    ) -> List[Tuple[Optional[str], float]]:
+        """Best label per document; `offsets` marks each document's first chunk."""
+        # both sides are unit-normalised, so the dot product is the cosine
+        chunk_sims = chunk_embs @ labels.embeddings.T  # (n_chunks, n_labels)
+        if pooling == "mean":
+            counts = np.diff(np.append(offsets, len(chunk_sims)))
+            sims = np.add.reduceat(chunk_sims, offsets, axis=0) / counts[:, None]
+        else:
+            sims = np.maximum.reduceat(chunk_sims, offsets, axis=0)
+        idx = np.argmax(sims, axis=1)
+        best = sims[np.arange(len(idx)), idx]
+        return [(labels.names[i], float(c)) for i, c in zip(idx, best)]
 
-    def _governing_law(self, text: str) -> Tuple[Optional[str], float]:
+    def _governing_law(self, text: str, doc) -> Tuple[Optional[str], float]:
         t = norm(text)
 
         # Rule-based hints
@@ -58,7 +124,6 @@ class AnalyzerService:
                 return code, 0.70
 
         # NER fallback
-        doc = self._nlp(text[:8000])
         gpes = [ent.text.lower() for ent in doc.ents if ent.label_ in ("GPE", "LOC")]
         if any("united states" in g for g in gpes):
             return "US", 0.65
@@ -75,8 +140,7 @@ class AnalyzerService:
             return "AE", 0.65
         return None, 0.0
 
-    def _extract_parties(self, text: str) -> List[str]:
-        doc = self._nlp(text[:8000])
+    def _extract_parties(self, doc) -> List[str]:
         orgs = [ent.text for ent in doc.ents if ent.label_ in ("ORG", "PERSON")]
         seen, parties = set(), []
         for o in orgs:
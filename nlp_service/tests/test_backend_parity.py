@@ -0,0 +1,20 @@
+import os
+
+import pytest
+
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("onnxruntime")
+
+from nlp_service.bench_embedder import DEFAULT_TOLERANCE, compare_backends
+
+# Needs a model exported by export_onnx.py, e.g.
+#   NLP_PARITY_MODEL=/app/models/embedder
+#   NLP_PARITY_ONNX_FILE=onnx/model_qint8_avx2.onnx
+MODEL = os.environ.get("NLP_PARITY_MODEL")
+ONNX_FILE = os.environ.get("NLP_PARITY_ONNX_FILE", "")
+
+
+@pytest.mark.skipif(not MODEL, reason="NLP_PARITY_MODEL not set")
+def test_onnx_scores_match_torch():
+    report = compare_backends(MODEL, "onnx", ONNX_FILE, runs=3)
+    assert report["max_abs_cosine_diff"] <= DEFAULT_TOLERANCE, report
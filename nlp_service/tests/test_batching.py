@@ -0,0 +1,103 @@
+import asyncio
+import threading
+
+import pytest
+
+from nlp_service.batching import MicroBatcher
+
+
+# ---------- helpers ----------
+
+
+class RecordingBatch:
+    """run_batch stand-in: echoes each text and records the batch sizes."""
+
+    def __init__(self, fail_on=None):
+        self.batches = []
+        self.fail_on = fail_on
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        if self.fail_on in texts:
+            raise ValueError(f"cannot analyze {self.fail_on}")
+        return [{"title": t} for t in texts]
+
+
+async def _submit_all(batcher, texts):
+    batcher.start()
+    try:
+        return await asyncio.gather(
+            *(batcher.submit(t) for t in texts), return_exceptions=True
+        )
+    finally:
+        await batcher.stop()
+
+
+# ---------- tests ----------
+
+
+def test_concurrent_requests_coalesce_up_to_max_batch_size():
+    run = RecordingBatch()
+    batcher = MicroBatcher(run, max_batch_size=4, max_wait_ms=50)
+
+    asyncio.run(_submit_all(batcher, [f"doc{i}" for i in range(10)]))
+
+    assert [len(b) for b in run.batches] == [4, 4, 2]
+
+
+def test_each_caller_gets_its_own_result_in_order():
+    run = RecordingBatch()
+    batcher = MicroBatcher(run, max_batch_size=3, max_wait_ms=50)
+    texts = [f"doc{i}" for i in range(7)]
+
+    results = asyncio.run(_submit_all(batcher, texts))
+
+    assert results == [{"title": t} for t in texts]
+    assert sum(run.batches, []) == texts
+
+
+def test_batch_failure_reaches_every_caller_in_it():
+    run = RecordingBatch(fail_on="bad")
+    batcher = MicroBatcher(run, max_batch_size=8, max_wait_ms=50)
+
+    results = asyncio.run(_submit_all(batcher, ["a", "bad", "c"]))
+
+    assert len(run.batches) == 1
+    assert all(isinstance(r, ValueError) for r in results)
+    assert len({id(r) for r in results}) == 1  # the batch's exception, shared
+
+
+def test_stop_fails_queued_and_in_flight_requests():
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking(texts):
+        started.set()
+        release.wait(5)
+        return [{"title": t} for t in texts]
+
+    async def scenario():
+        batcher = MicroBatcher(blocking, max_batch_size=1, max_wait_ms=0)
+        batcher.start()
+        tasks = [asyncio.ensure_future(batcher.submit(t)) for t in ("a", "b", "c")]
+        while not started.is_set():  # "a" is running, "b" and "c" are queued
+            await asyncio.sleep(0.01)
+        await batcher.stop()
+        release.set()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    assert [str(r) for r in results] == ["batcher stopped"] * 3
+
+
+def test_stop_before_start_fails_queued_requests():
+    async def scenario():
+        batcher = MicroBatcher(RecordingBatch())
+        task = asyncio.ensure_future(batcher.submit("a"))
+        await asyncio.sleep(0)
+        await batcher.stop()
+        with pytest.raises(RuntimeError, match="batcher stopped"):
+            await task
+
+    asyncio.run(scenario())
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from nlp_service.services import AnalyzerService, LabelMatrix
+from nlp_service.utils import chunk_text
+
+
+# ---------- helpers ----------
+
+
+def _best_labels(chunk_embs, offsets, labels, pooling):
+    # _best_labels doesn't touch the models, so no service instance is needed
+    return AnalyzerService._best_labels(None, chunk_embs, np.asarray(offsets), labels, pooling)
+
+
+def _unit(rows):
+    m = np.asarray(rows, dtype=np.float32)
+    return m / np.linalg.norm(m, axis=1, keepdims=True)
+
+
+LABELS = LabelMatrix(["NDA", "MSA", "Lease"], np.eye(3, dtype=np.float32))
+
+# three documents with 1, 3 and 2 chunks
+CHUNKS = _unit(
+    [
+        [0.9, 0.1, 0.0],  # doc 0
+        [0.2, 0.9, 0.0],  # doc 1
+        [0.0, 0.1, 0.99],
+        [0.5, 0.6, 0.0],
+        [0.0, 0.8, 0.6],  # doc 2
+        [0.7, 0.0, 0.7],
+    ]
+)
+OFFSETS = [0, 1, 4]
+
+
+def _expected(pool):
+    out = []
+    for start, stop in zip(OFFSETS, OFFSETS[1:] + [len(CHUNKS)]):
+        sims = pool(CHUNKS[start:stop] @ LABELS.embeddings.T, axis=0)
+        out.append((LABELS.names[int(np.argmax(sims))], float(np.max(sims))))
+    return out
+
+
+# ---------- tests ----------
+
+
+def test_chunk_text_keeps_first_and_last_window_within_budget():
+    text = "".join(f"{i:04d}" for i in range(2500))  # 10,000 chars
+    chunks = chunk_text(text, size=600, overlap=100, max_chunks=8)
+
+    assert len(chunks) == 8
+    assert chunks[0] == text[:600]
+    assert text.endswith(chunks[-1][-100:])  # last window reaches the end
+    starts = [text.index(c) for c in chunks]
+    assert starts == sorted(starts)
+
+
+def test_chunk_text_without_budget_pressure_covers_everything():
+    text = "x" * 1000 + "y" * 1000
+    chunks = chunk_text(text, size=600, overlap=100, max_chunks=50)
+    assert len(chunks) == 4
+    assert "".join(c[:500] for c in chunks[:-1]) + chunks[-1] == text
+
+
+@pytest.mark.parametrize("max_chunks", [0, 1])
+def test_chunk_text_short_or_single_chunk(max_chunks):
+    assert chunk_text("short", size=600, overlap=100, max_chunks=8) == ["short"]
+    assert chunk_text("z" * 2000, size=600, overlap=100, max_chunks=max_chunks) == ["z" * 600]
+
+
+@pytest.mark.parametrize("pooling, pool", [("max", np.max), ("mean", np.mean)])
+def test_best_labels_pools_uneven_chunk_counts_per_document(pooling, pool):
+    got = _best_labels(CHUNKS, OFFSETS, LABELS, pooling)
+    want = _expected(pool)
+
+    assert [name for name, _ in got] == [name for name, _ in want]
+    assert [conf for _, conf in got] == pytest.approx([conf for _, conf in want], abs=1e-6)
+
+
+def test_max_and_mean_pooling_can_disagree():
+    # doc 1 has one strong "Lease" chunk but leans "MSA" on average
+    assert _best_labels(CHUNKS, OFFSETS, LABELS, "max")[1][0] == "Lease"
+    assert _best_labels(CHUNKS, OFFSETS, LABELS, "mean")[1][0] == "MSA"
@@ -0,0 +1,51 @@
+import gzip
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from nlp_service.middleware import GzipRequestMiddleware
+
+
+def _client(max_size=1024):
+    app = FastAPI()
+    app.add_middleware(GzipRequestMiddleware, max_size=max_size)
+
+    @app.post("/echo")
+    def echo(payload: dict):
+        return payload
+
+    return TestClient(app)
+
+
+def test_gzip_body_is_inflated():
+    body = gzip.compress(json.dumps({"text": "hello"}).encode())
+    r = _client().post(
+        "/echo",
+        content=body,
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    )
+    assert r.status_code == 200
+    assert r.json() == {"text": "hello"}
+
+
+def test_plain_body_passes_through():
+    assert _client().post("/echo", json={"text": "hi"}).json() == {"text": "hi"}
+
+
+def test_bad_and_oversized_gzip_bodies_are_rejected():
+    client = _client(max_size=100)
+    headers = {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+
+    assert client.post("/echo", content=b"not gzip", headers=headers).status_code == 400
+    big = gzip.compress(json.dumps({"text": "x" * 1000}).encode())
+    assert client.post("/echo", content=big, headers=headers).status_code == 413
+
+
+def test_truncated_gzip_body_is_rejected():
+    headers = {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+    body = gzip.compress(json.dumps({"text": "hello " * 50}).encode())
+
+    r = _client().post("/echo", content=body[:-12], headers=headers)
+
+    assert r.status_code == 400
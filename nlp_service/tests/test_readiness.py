@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from nlp_service import main
+from nlp_service.warmup import ModelLoader
+
+
+# ---------- helpers / fakes ----------
+
+
+class TitleAnalyzer:
+    def analyze(self, text):
+        return self.analyze_batch([text])[0]
+
+    def analyze_batch(self, texts):
+        return [{"title": t} for t in texts]
+
+
+class GatedFactory:
+    """Loader factory that blocks until `release()`, then builds or raises."""
+
+    def __init__(self, error=None):
+        self.gate = threading.Event()
+        self.error = error
+
+    def release(self):
+        self.gate.set()
+
+    def __call__(self):
+        self.gate.wait(10)
+        if self.error:
+            raise self.error
+        return TitleAnalyzer()
+
+
+@pytest.fixture
+def client():
+    # no `with`: the app's lifespan would start the real loader
+    return TestClient(main.app)
+
+
+def _use_loader(monkeypatch, factory):
+    loader = ModelLoader(factory, preload_models=False)
+    monkeypatch.setattr(main, "loader", loader)
+    monkeypatch.setattr(main, "result_cache", None)
+    monkeypatch.setattr(main, "batcher", None)
+    loader.start()
+    return loader
+
+
+# ---------- tests ----------
+
+
+def test_requests_get_503_until_models_are_loaded(monkeypatch, client):
+    factory = GatedFactory()
+    loader = _use_loader(monkeypatch, factory)
+
+    r = client.get("/health/ready")
+    assert r.status_code == 503
+    assert r.json()["ready"] is False
+    r = client.post("/analyze", json={"text": "NDA"})
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "5"
+    assert "loading" in r.json()["detail"]
+    r = client.get("/health/live")
+    assert r.status_code == 200
+    assert r.json()["ready"] is False
+
+    factory.release()
+    assert loader.wait(10)
+
+    r = client.get("/health/ready")
+    assert r.status_code == 200
+    assert r.json()["phase"] == "ready"
+    assert "warmup_s" in r.json()["timings"]
+    assert client.post("/analyze", json={"text": "NDA"}).json()["title"] == "NDA"
+    assert client.get("/health/live").status_code == 200
+
+
+def test_load_failure_is_reported(monkeypatch, client):
+    factory = GatedFactory(error=RuntimeError("out of memory"))
+    loader = _use_loader(monkeypatch, factory)
+    factory.release()
+    loader._thread.join(10)
+
+    r = client.get("/health/ready")
+    assert r.status_code == 503
+    body = r.json()
+    assert body["phase"] == "failed"
+    assert body["error"] == "workers_start: out of memory"
+    assert client.post("/analyze", json={"text": "NDA"}).status_code == 503
+    assert client.get("/health/live").status_code == 200
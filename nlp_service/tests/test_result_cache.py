@@ -0,0 +1,60 @@
+from nlp_service import cache
+from nlp_service.cache import DiskStore, ResultCache, result_cache_version
+from nlp_service.config import Settings
+
+
+def test_lru_evicts_oldest_and_counts_hits():
+    rc = ResultCache("v1", max_size=2)
+    rc.set("a", {"title": "A"})
+    rc.set("b", {"title": "B"})
+    assert rc.get("a") == {"title": "A"}  # refreshes "a"
+    rc.set("c", {"title": "C"})
+
+    assert rc.get("b") is None
+    assert rc.get("a") == {"title": "A"}
+    assert rc.stats()["hits"] == 2
+    assert rc.stats()["misses"] == 1
+
+
+def test_disk_store_survives_restart_but_not_version_change(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    rc = ResultCache("v1", disk=DiskStore(path, "v1"))
+    rc.set("doc", {"title": "Doc"})
+    rc.close()
+
+    again = ResultCache("v1", disk=DiskStore(path, "v1"))
+    assert again.get("doc") == {"title": "Doc"}
+    again.close()
+
+    bumped = ResultCache("v2", disk=DiskStore(path, "v2"))
+    assert bumped.get("doc") is None
+    bumped.close()
+
+
+def test_disk_store_is_bounded(tmp_path):
+    store = DiskStore(str(tmp_path / "r.sqlite"), "v1", max_rows=3)
+    for i in range(5):
+        store.set(f"k{i}", {"i": i})
+
+    assert store.get("k0") is None
+    assert store.get("k4") == {"i": 4}
+    store.close()
+
+
+def test_version_tracks_model_and_labels(monkeypatch):
+    base = result_cache_version(Settings())
+
+    assert result_cache_version(Settings(embed_model_name="other")) != base
+    monkeypatch.setitem(cache.AGREEMENT_LABELS, "Loan", "loan agreement")
+    assert result_cache_version(Settings()) != base
+
+
+def test_many_helpers_round_trip_through_disk(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    rc = ResultCache("v1", disk=DiskStore(path, "v1"))
+    rc.set_many([("a", {"title": "A"}), ("b", {"title": "B"})])
+    rc.close()
+
+    again = ResultCache("v1", disk=DiskStore(path, "v1"))
+    assert again.get_many(["b", "x", "a"]) == [{"title": "B"}, None, {"title": "A"}]
+    again.close()
@@ -0,0 +1,119 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from nlp_service import main
+from nlp_service.workers import PoolBusy, WorkerPool
+
+
+# ---------- helpers / fakes ----------
+
+
+class EchoAnalyzer:
+    """Worker analyzer stand-in: "sleep:<s>" blocks, "die" kills the worker."""
+
+    def analyze(self, text):
+        return self.analyze_batch([text])[0]
+
+    def analyze_batch(self, texts):
+        out = []
+        for t in texts:
+            if t == "die":
+                os._exit(1)
+            if t.startswith("sleep:"):
+                time.sleep(float(t[len("sleep:"):]))
+            out.append({"title": t, "pid": os.getpid()})
+        return out
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def _make(workers=1, max_pending=4):
+        pool = WorkerPool(
+            workers, max_pending=max_pending, start_timeout=60, analyzer_factory=EchoAnalyzer
+        )
+        pools.append(pool)
+        return pool
+
+    yield _make
+    for pool in pools:
+        pool.close()
+
+
+def _wait_for(predicate, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.05)
+
+
+# ---------- tests ----------
+
+
+def test_batches_run_in_worker_processes(make_pool):
+    pool = make_pool(workers=2)
+
+    results = asyncio.run(pool.submit(["a", "b"]))
+
+    assert [r["title"] for r in results] == ["a", "b"]
+    assert results[0]["pid"] != os.getpid()
+    assert pool.pending == 0
+
+
+def test_requests_beyond_max_pending_get_503(make_pool):
+    pool = make_pool(max_pending=1)
+
+    async def scenario():
+        held = asyncio.ensure_future(pool.submit(["sleep:0.5"]))
+        await asyncio.sleep(0.05)
+        assert pool.pending == 1
+        with pytest.raises(PoolBusy):
+            await pool.submit(["x"])
+        with pytest.raises(HTTPException) as exc:
+            await main._run_in_pool(pool, ["x"])
+        await held
+        return exc.value
+
+    err = asyncio.run(scenario())
+
+    assert err.status_code == 503
+    assert err.headers["Retry-After"] == "1"
+    assert pool.pending == 0
+
+
+def test_dead_worker_releases_its_slot_and_pool_rebuilds(make_pool, monkeypatch):
+    pool = make_pool(max_pending=2)
+    # hold the rebuild so requests made meanwhile can be observed
+    rebuild = threading.Event()
+    start = pool._start
+    pool._start = lambda: rebuild.wait(30) and start()
+    monkeypatch.setattr(main, "loader", SimpleNamespace(ready=True, service=pool))
+    client = TestClient(main.app)
+
+    with pytest.raises(BrokenProcessPool):
+        asyncio.run(pool.submit(["die"]))
+    assert pool.pending == 0
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(main._run_in_pool(pool, ["x"]))
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == "5"
+    assert pool.pending == 0
+    assert client.get("/health").json()["worker_restarts"] == 0
+
+    rebuild.set()
+    _wait_for(lambda: pool.restarts == 1)
+
+    assert asyncio.run(pool.submit(["x"]))[0]["title"] == "x"
+    health = client.get("/health").json()
+    assert health["worker_restarts"] == 1
+    assert health["pending"] == 0
@@ -1,5 +1,5 @@
 import re
-from typing import Optional
+from typing import List, Optional
 
 DATE_RE = re.compile(
     r"\b(20\d{2}|19\d{2})[-/.](0?[1-9]|1[0-2])[-/.](0?[1-9]|[12]\d|3[01])\b|"
@@ -24,3 +24,21 @@ def first_date(text: str) -> Optional[str]:
 
 def norm(s: str) -> str:
     return (s or "").lower().strip()
+
+
+def chunk_text(text: str, size: int, overlap: int, max_chunks: int) -> List[str]:
+    """
+    Overlapping windows over the whole text. When there are more windows
+    than `max_chunks`, keep an evenly spaced subset (always first and last)
+    so the budget still covers the end of long documents.
+    """
+    if len(text) <= size or max_chunks <= 1:
+        return [text[:size]]
+    step = max(1, size - overlap)
+    starts = list(range(0, len(text) - overlap, step))
+    if len(starts) > max_chunks:
+        last = len(starts) - 1
+        starts = [
+            starts[round(i * last / (max_chunks - 1))] for i in range(max_chunks)
+        ]
+    return [text[s : s + size] for s in starts]
@@ -0,0 +1,107 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# one short document through the whole pipeline, so the first real request
+# doesn't pay for lazy allocations in torch/spaCy
+WARMUP_TEXT = (
+    "MUTUAL NON-DISCLOSURE AGREEMENT\n"
+    "This Agreement is made on 1 January 2024 between Acme Corp and Globex Ltd "
+    "and is governed by the laws of England."
+)
+
+
+class ModelLoader:
+    """
+    Builds the analyzer off the request path and records how long each
+    startup phase took.
+
+    `start()` runs the load in a daemon thread so the server can answer
+    liveness probes at once; `service` stays None until the warm-up
+    inference has finished. With `preload_models=False` the factory is
+    expected to load models elsewhere (e.g. in worker processes) and only
+    its own start-up is timed.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], object],
+        warmup_text: str = WARMUP_TEXT,
+        preload_models: bool = True,
+    ):
+        self._factory = factory
+        self.warmup_text = warmup_text
+        self.preload_models = preload_models
+        self.service = None
+        self.phase = "pending"
+        self.error: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    @contextmanager
+    def _timed(self, phase: str):
+        self.phase = phase
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[f"{phase}_s"] = round(time.perf_counter() - t0, 3)
+
+    def load(self) -> None:
+        t0 = time.perf_counter()
+        try:
+            if self.preload_models:
+                # deferred so importing the app doesn't pull in torch/spaCy
+                from .dependencies import get_embedder, get_nlp
+
+                with self._timed("spacy_load"):
+                    get_nlp()
+                with self._timed("embedder_load"):
+                    get_embedder()
+                with self._timed("label_encode"):
+                    service = self._factory()
+            else:
+                with self._timed("workers_start"):
+                    service = self._factory()
+            with self._timed("warmup"):
+                service.analyze(self.warmup_text)
+            self.service = service
+            self.phase = "ready"
+            self._ready.set()
+        except Exception as e:
+            logger.exception("Model loading failed during %s", self.phase)
+            self.error = f"{self.phase}: {e}"
+            self.phase = "failed"
+        finally:
+            self.timings["total_s"] = round(time.perf_counter() - t0, 3)
+            logger.info("Model loading %s: %s", self.phase, self.timings)
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self.load, name="model-loader", daemon=True
+            )
+            self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def close(self) -> None:
+        close = getattr(self.service, "close", None)
+        if close is not None:
+            close()
+
+    def status(self) -> Dict:
+        out = {"ready": self.ready, "phase": self.phase, "timings": dict(self.timings)}
+        if self.error:
+            out["error"] = self.error
+        return out
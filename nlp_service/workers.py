@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional
+
+from .warmup import WARMUP_TEXT
+
+logger = logging.getLogger(__name__)
+
+# the analyzer owned by this worker process (set by _init_worker)
+_worker_svc = None
+
+
+class PoolBusy(Exception):
+    """Raised when the pool already has `max_pending` requests in flight."""
+
+
+def _init_worker(
+    ready_q, torch_threads: int, analyzer_factory: Optional[Callable[[], object]] = None
+) -> None:
+    global _worker_svc
+    try:
+        if torch_threads > 0:
+            try:
+                import torch
+
+                # the workers share the vCPUs; don't let each one grab all of them
+                torch.set_num_threads(torch_threads)
+            except ImportError:
+                pass
+        if analyzer_factory is None:
+            from .services import AnalyzerService
+
+            analyzer_factory = AnalyzerService
+        _worker_svc = analyzer_factory()
+        _worker_svc.analyze(WARMUP_TEXT)
+        ready_q.put((os.getpid(), None))
+    except Exception as e:  # reported to the parent instead of respawning forever
+        ready_q.put((os.getpid(), repr(e)))
+        raise
+
+
+def _analyze_batch(texts: List[str]) -> List[Dict]:
+    return _worker_svc.analyze_batch(texts)
+
+
+class WorkerPool:
+    """
+    Runs analysis in `workers` pre-warmed processes, each with its own models,
+    so spaCy and the Python post-processing are not serialised on one GIL.
+
+    At most `max_pending` requests are accepted at a time (running or
+    queued); `submit` raises PoolBusy beyond that so callers can shed load.
+    If a worker dies, its requests fail with BrokenProcessPool (as does
+    everything submitted until the replacement pool has warmed up).
+
+    `analyzer_factory` builds each worker's analyzer (AnalyzerService by
+    default); it must be picklable, i.e. a module-level callable.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_pending: int = 32,
+        start_timeout: float = 300.0,
+        analyzer_factory: Optional[Callable[[], object]] = None,
+    ):
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.start_timeout = start_timeout
+        self.analyzer_factory = analyzer_factory
+        self.restarts = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._restarting = False
+        self._closed = False
+        self._executor = self._start()
+
+    def _start(self) -> ProcessPoolExecutor:
+        # fork is unsafe once torch has started its thread pools
+        ctx = multiprocessing.get_context("spawn")
+        ready_q = ctx.Queue()
+        torch_threads = max(1, (os.cpu_count() or 1) // self.workers)
+        executor = ProcessPoolExecutor(
+            self.workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(ready_q, torch_threads, self.analyzer_factory),
+        )
+        try:
+            # spawned executors start workers on demand, one per submit
+            # while none is idle; wait until each has loaded its models and
+            # run the warm-up text
+            for _ in range(self.workers):
+                executor.submit(os.getpid)
+            for _ in range(self.workers):
+                pid, error = ready_q.get(timeout=self.start_timeout)
+                if error:
+                    raise RuntimeError(f"worker {pid} failed to start: {error}")
+        except Exception:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        return executor
+
+    def _on_broken(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._closed or self._restarting or executor is not self._executor:
+                return
+            self._restarting = True
+        logger.warning("A worker process died; restarting the pool")
+        threading.Thread(
+            target=self._restart, args=(executor,), name="worker-pool-restart", daemon=True
+        ).start()
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        broken.shutdown(wait=False, cancel_futures=True)
+        try:
+            executor = self._start()
+        except Exception as e:  # the next failed submit tries again
+            logger.error("Worker pool restart failed: %s", e)
+            with self._lock:
+                self._restarting = False
+            return
+        with self._lock:
+            self._restarting = False
+            if not self._closed:
+                self._executor = executor
+                self.restarts += 1
+                executor = None
+        if executor is not None:  # closed while restarting
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PoolBusy(f"{self._pending} requests already queued")
+            self._pending += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _submit(self, texts: List[str]) -> Future:
+        executor = self._executor
+        try:
+            return executor.submit(_analyze_batch, texts)
+        except BrokenProcessPool:
+            self._on_broken(executor)
+            raise
+
+    async def submit(self, texts: List[str]) -> List[Dict]:
+        self._acquire()
+        executor = self._executor
+        try:
+            cf = self._submit(texts)
+        except Exception:
+            self._release()
+            raise
+
+        # runs on the executor's management thread, also when a worker dies,
+        # so the slot is always given back
+        def _done(f: Future) -> None:
+            self._release()
+            if not f.cancelled() and isinstance(f.exception(), BrokenProcessPool):
+                self._on_broken(executor)
+
+        cf.add_done_callback(_done)
+        return await asyncio.wrap_future(cf)
+
+    # blocking helpers, for callers outside the event loop
+    def analyze_batch(self, texts: List[str]) -> List[Dict]:
+        return self._submit(texts).result()
+
+    def analyze(self, text: str) -> Dict:
+        return self.analyze_batch([text])[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=True, cancel_futures=True)
@@ -2,6 +2,7 @@
 import os
 import boto3
 import logging
+from botocore.config import Config
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -9,22 +10,59 @@ logger.setLevel(logging.INFO)
 # ------------------ ENV ------------------
 DOCUMENTS_TABLE = os.environ["DOCUMENTS_TABLE"]
 DOCS_BUCKET = os.environ["DOCS_BUCKET"]
+STATS_TABLE = os.environ.get("STATS_TABLE")  # dashboard counters (optional)
 
 TEXT_PREFIX = os.environ.get("TEXT_PREFIX", "extracted/")
 if not TEXT_PREFIX.endswith("/"):
     TEXT_PREFIX = TEXT_PREFIX + "/"
 
+# objects larger than this are streamed to a temp file in /tmp instead of
+# being held in memory while they are extracted
+S3_SPOOL_MAX_BYTES = int(os.environ.get("S3_SPOOL_MAX_BYTES", str(16 * 1024 * 1024)))
+
+# PDF extraction: page-parallel in worker processes for documents of
+# at least PDF_PARALLEL_MIN_PAGES pages (workers bounded by the function's
+# vCPUs and PDF_MEMORY_CEILING_MB, default half its memory). PDF_MAX_PAGES
+# and PDF_TIME_BUDGET_SECONDS (0 = off) cut extraction short with partial text.
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get("PDF_PARALLEL_MIN_PAGES", "16"))
+PDF_MAX_WORKERS = int(os.environ.get("PDF_MAX_WORKERS", "0"))  # 0 = vCPUs
+PDF_WORKER_MEMORY_MB = int(os.environ.get("PDF_WORKER_MEMORY_MB", "128"))
+PDF_MEMORY_CEILING_MB = int(os.environ.get("PDF_MEMORY_CEILING_MB", "0"))
+PDF_MAX_PAGES = int(os.environ.get("PDF_MAX_PAGES", "0"))
+PDF_TIME_BUDGET_SECONDS = float(os.environ.get("PDF_TIME_BUDGET_SECONDS", "0"))
+
 AWS_REGION = (
     os.environ.get("AWS_REGION")
     or os.environ.get("AWS_DEFAULT_REGION")
     or "eu-central-1"
 )
 
+# stamped on every DocumentsTable row; bump it to re-ingest objects whose
+# bytes haven't changed (new labels, model or extractors)
+NLP_VERSION = os.environ.get("NLP_VERSION", "oss-v1")
+# reprocess even when the stored etag/nlpVersion say nothing changed
+FORCE_REPROCESS = os.environ.get("FORCE_REPROCESS", "").lower() in ("1", "true", "yes")
+
 NLP_URL = os.environ.get("NLP_URL")  # e.g. https://<id>.<region>.awsapprunner.com
 if NLP_URL and not NLP_URL.startswith(("http://", "https://")):
     NLP_URL = "https://" + NLP_URL
+NLP_TIMEOUT_SECONDS = float(os.environ.get("NLP_TIMEOUT_SECONDS", "20"))
+NLP_MAX_ATTEMPTS = max(1, int(os.environ.get("NLP_MAX_ATTEMPTS", "3")))
+
+# records of one event processed concurrently (S3 GET, NLP call and writes
+# are mostly I/O wait)
+MAX_RECORD_WORKERS = max(1, int(os.environ.get("MAX_RECORD_WORKERS", "8")))
+
+# events with at least this many records write DocumentsTable in bulk
+# (conditional TransactWriteItems) instead of one put per record. Off by
+# default: transactional writes cost 2 WCU per item and the counter deltas
+# come from a pre-read rather than the replaced row; 0 disables
+BULK_WRITE_MIN_RECORDS = int(os.environ.get("BULK_WRITE_MIN_RECORDS", "0"))
 
 # ---------------- AWS CLIENTS ------------
-dynamodb = boto3.resource("dynamodb", region_name=AWS_REGION)
-doc_table = dynamodb.Table(DOCUMENTS_TABLE)
-s3 = boto3.client("s3", region_name=AWS_REGION)
+# one HTTP connection per record worker, so they don't queue on the pool
+_boto_config = Config(max_pool_connections=max(10, MAX_RECORD_WORKERS))
+# records are written from worker threads: go through dynamodb.meta.client
+# (thread-safe, and it still takes plain Python values), not Table resources
+dynamodb = boto3.resource("dynamodb", region_name=AWS_REGION, config=_boto_config)
+s3 = boto3.client("s3", region_name=AWS_REGION, config=_boto_config)
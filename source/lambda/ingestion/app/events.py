@@ -1,6 +1,10 @@
-
+import json
+import logging
 from typing import Dict, Any, List
 
+logger = logging.getLogger(__name__)
+
+
 def records_from_event(event) -> List[Dict[str, Any]]:
     recs = []
     if (
@@ -13,6 +17,7 @@ def records_from_event(event) -> List[Dict[str, Any]]:
                 {
                     "bucket": event["detail"]["bucket"]["name"],
                     "key": event["detail"]["object"]["key"],
+                    "etag": event["detail"]["object"].get("etag"),
                     "eventTime": event.get("time"),
                 }
             )
@@ -20,14 +25,34 @@ def records_from_event(event) -> List[Dict[str, Any]]:
             pass
     if "Records" in event:
         for r in event["Records"]:
+            if r.get("eventSource") == "aws:sqs":
+                recs.extend(_records_from_sqs_message(r))
+                continue
             try:
                 recs.append(
                     {
                         "bucket": r["s3"]["bucket"]["name"],
                         "key": r["s3"]["object"]["key"],
+                        "etag": r["s3"]["object"].get("eTag"),
                         "eventTime": r.get("eventTime"),
                     }
                 )
             except Exception:
                 continue
     return recs
+
+
+def _records_from_sqs_message(msg: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # body is the EventBridge event (or an S3 notification) as JSON; records
+    # keep the messageId so failures can be reported per message
+    try:
+        inner = json.loads(msg["body"])
+    except Exception:
+        logger.warning("Dropping unparseable SQS message %s", msg.get("messageId"))
+        return []
+    if not isinstance(inner, dict):
+        return []
+    recs = records_from_event(inner)
+    for rec in recs:
+        rec["messageId"] = msg.get("messageId")
+    return recs
@@ -1,9 +1,13 @@
 
 import io
+import os
+import time
 import zipfile
 import xml.etree.ElementTree as ET
 import logging
-from typing import Tuple
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+from . import config
+from .pdf_parallel import extract_pages_parallel, plan_workers
 
 logger = logging.getLogger(__name__)
 
@@ -22,68 +26,148 @@ except Exception as e:
     docx = None
     logger.warning("Failed to load docx: %s", e)
 
+# document content: raw bytes or a seekable binary file (see s3_io.open_s3_object)
+Source = Union[bytes, BinaryIO]
+
 def normalize_ext(key: str) -> str:
     dot = key.rfind(".")
     return key[dot + 1:].lower() if dot != -1 else ""
 
-def _extract_text_pdf(data: bytes) -> Tuple[str, int]:
+def _as_stream(data: Source) -> BinaryIO:
+    if isinstance(data, (bytes, bytearray)):
+        return io.BytesIO(data)
+    data.seek(0)
+    return data
+
+def _source_size(data: Source) -> int:
+    if isinstance(data, (bytes, bytearray)):
+        return len(data)
+    return data.seek(0, os.SEEK_END)
+
+def _worker_source(data: Source) -> Union[bytes, str]:
+    """
+    What PDF worker processes read: the bytes themselves, or a path to the
+    file so the parent doesn't load a spooled document into memory.
+    """
+    if isinstance(data, (bytes, bytearray)):
+        return bytes(data)
+    name = getattr(data, "name", None)
+    if isinstance(name, str) and os.path.isfile(name):
+        return name
+    # unnamed temp file; fileno() also rolls an in-memory SpooledTemporaryFile
+    # over to one. Workers open it through procfs for their own file offset.
+    data.flush()
+    return f"/proc/{os.getpid()}/fd/{data.fileno()}"
+
+def _extract_text_pdf(data: Source) -> Tuple[str, int]:
     if PdfReader is None:
         logger.warning("PdfReader not available; skipping PDF text")
         return "", 0
-    pdf = PdfReader(io.BytesIO(data))
+    pdf = PdfReader(_as_stream(data))
     pages = len(pdf.pages)
-    out = []
-    for i in range(pages):
+    limit = min(pages, config.PDF_MAX_PAGES) if config.PDF_MAX_PAGES > 0 else pages
+    deadline = (
+        time.monotonic() + config.PDF_TIME_BUDGET_SECONDS
+        if config.PDF_TIME_BUDGET_SECONDS > 0
+        else None
+    )
+
+    out: List[Optional[str]] = [None] * limit
+    workers = plan_workers(limit, _source_size(data))
+    if workers > 1:
+        out = extract_pages_parallel(_worker_source(data), limit, workers, deadline) or out
+    # serial path, and any pages a worker didn't deliver
+    for i in range(limit):
+        if out[i] is not None:
+            continue
+        if deadline is not None and time.monotonic() >= deadline:
+            break
         try:
-            out.append(pdf.pages[i].extract_text() or "")
+            out[i] = pdf.pages[i].extract_text() or ""
         except Exception as e:
             logger.warning("Failed to extract text from page %d: %s", i, e)
-            out.append("")
-    text = "\n".join(out).strip()
+            out[i] = ""
+    done = [t for t in out if t is not None]
+    if len(done) < pages:
+        logger.warning("Partial PDF text: %d of %d page(s)", len(done), pages)
+    text = "\n".join(done).strip()
     logger.info("Extracted PDF text length: %d", len(text))
     return text, pages
 
-def _extract_text_docx_stdlib(data: bytes) -> Tuple[str, int]:
+def _iter_docx_lines(data: Source) -> Iterator[str]:
+    """
+    Stream the non-empty, stripped lines of word/document.xml. Text runs
+    (t) are concatenated, and a break (br) or the start of a paragraph (p)
+    begins a new line. Elements are dropped as soon as they are read, so
+    memory stays flat however large the document is.
+    """
+    buf: List[str] = []
+
+    def flush() -> Iterator[str]:
+        if not buf:
+            return
+        for ln in "".join(buf).splitlines():
+            ln = ln.strip()
+            if ln:
+                yield ln
+        buf.clear()
+
+    with zipfile.ZipFile(_as_stream(data)) as z:
+        with z.open("word/document.xml") as f:
+            stack = []  # open elements: document, body, ...
+            local_names = {}  # "{ns}tag" -> "tag"
+            for event, node in ET.iterparse(f, events=("start", "end")):
+                tag = local_names.get(node.tag)
+                if tag is None:
+                    tag = local_names[node.tag] = node.tag.split("}")[-1]
+                if event == "start":
+                    stack.append(node)
+                    if tag == "p":
+                        yield from flush()
+                    continue
+                stack.pop()
+                if tag == "t":
+                    if node.text:
+                        buf.append(node.text)
+                elif tag == "br":
+                    yield from flush()
+                if len(stack) == 2:
+                    # a finished block (paragraph, table, ...) in the body
+                    stack[1].remove(node)
+                    node.clear()
+    yield from flush()
+
+def _extract_text_docx_stdlib(data: Source) -> Optional[Tuple[str, int]]:
+    """Streaming DOCX text; None if the file can't be parsed this way."""
     try:
-        with zipfile.ZipFile(io.BytesIO(data)) as z:
-            with z.open("word/document.xml") as f:
-                xml = f.read()
-        root = ET.fromstring(xml)
-        texts = []
-        for node in root.iter():
-            tag = node.tag.split("}")[-1]
-            if tag == "t":
-                if node.text:
-                    texts.append(node.text)
-            elif tag == "br":
-                texts.append("\n")
-            elif tag == "p":
-                texts.append("\n")
-        text = "".join(texts)
-        lines = [ln.strip() for ln in text.splitlines()]
-        text = "\n".join([ln for ln in lines if ln])
-        pages = max(1, text.count("\n") // 40)
-        logger.info("Extracted DOCX(stdlib) text length: %d", len(text))
-        return text, pages
+        text = "\n".join(_iter_docx_lines(data))
     except Exception as e:
         logger.warning("DOCX stdlib parse failed: %s", e)
-        return "", 0
+        return None
+    pages = max(1, text.count("\n") // 40)
+    logger.info("Extracted DOCX(stdlib) text length: %d", len(text))
+    return text, pages
 
-def _extract_text_docx(data: bytes) -> Tuple[str, int]:
+def _extract_text_docx(data: Source) -> Tuple[str, int]:
+    result = _extract_text_docx_stdlib(data)
+    if result is not None:
+        return result
     if docx is not None:
         try:
-            document = docx.Document(io.BytesIO(data))
+            document = docx.Document(_as_stream(data))
             paras = [p.text for p in document.paragraphs if p.text]
             text = "\n".join(paras).strip()
             page_count = max(1, len(paras) // 40)
             logger.info("Extracted DOCX(python-docx) text length: %d", len(text))
             return text, page_count
         except Exception as e:
-            logger.warning("python-docx failed, falling back to stdlib: %s", e)
-    return _extract_text_docx_stdlib(data)
+            logger.warning("python-docx failed: %s", e)
+    return "", 0
 
-def _extract_text_plain(data: bytes) -> Tuple[str, int]:
+def _extract_text_plain(data: Source) -> Tuple[str, int]:
     try:
+        if not isinstance(data, (bytes, bytearray)):
+            data = _as_stream(data).read()
         text = data.decode("utf-8", errors="ignore")
         page_count = max(1, text.count("\n") // 40)
     except Exception:
@@ -91,7 +175,7 @@ def _extract_text_plain(data: bytes) -> Tuple[str, int]:
         page_count = 0
     return text, page_count
 
-def extract_text(data: bytes, ext: str) -> Tuple[str, int]:
+def extract_text(data: Source, ext: str) -> Tuple[str, int]:
     if ext == "pdf":
         return _extract_text_pdf(data)
     elif ext in ("docx", "doc"):
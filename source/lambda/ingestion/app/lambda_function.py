@@ -1,13 +1,81 @@
 
 import json
 import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from . import config
 from .events import records_from_event
-from .processor import process_record
+from .nlp_client import latency as nlp_latency
+from .persistence import write_documents_bulk
+from .processor import prepare_record, process_record
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+def _error_result(rec: Dict[str, Any], e: Exception) -> Dict[str, Any]:
+    logger.exception("Unhandled error for record %s", rec)
+    return {"documentId": str(uuid.uuid4()), "key": rec.get("key"), "status": f"ERROR: {e}"}
+
+
+# process_record/prepare_record report their own errors; these catch anything
+# they miss (e.g. a malformed record) so one record can't fail the whole event
+def _process_isolated(rec: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return process_record(rec)
+    except Exception as e:
+        return _error_result(rec, e)
+
+
+def _prepare_isolated(rec: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Dict]]:
+    try:
+        return prepare_record(rec)
+    except Exception as e:
+        return _error_result(rec, e), None
+
+
+def _map_records(fn: Callable, records: List[Dict[str, Any]]) -> List:
+    workers = min(config.MAX_RECORD_WORKERS, len(records))
+    if workers <= 1:
+        return [fn(r) for r in records]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fn, records))
+
+
+def _process_bulk(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    prepared = _map_records(_prepare_isolated, records)
+    items = [item for _, item in prepared if item is not None]
+    try:
+        statuses = write_documents_bulk(items) if items else {}
+    except Exception as e:
+        logger.exception("Bulk DocumentsTable write failed")
+        statuses = {item["documentId"]: f"ERROR: {e}" for item in items}
+    return [
+        {**result, "status": statuses[item["documentId"]]} if item is not None else result
+        for result, item in prepared
+    ]
+
+
+def process_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Process records concurrently; results are in the same order as `records`."""
+    if 0 < config.BULK_WRITE_MIN_RECORDS <= len(records):
+        return _process_bulk(records)
+    return _map_records(_process_isolated, records)
+
+
+def batch_item_failures(
+    records: List[Dict[str, Any]], results: List[Dict[str, Any]]
+) -> List[Dict[str, str]]:
+    """SQS messages with a failed record, so only those are redelivered."""
+    failed = []
+    for rec, res in zip(records, results):
+        msg_id = rec.get("messageId")
+        if msg_id and str((res or {}).get("status", "")).startswith("ERROR"):
+            if msg_id not in failed:
+                failed.append(msg_id)
+    return [{"itemIdentifier": m} for m in failed]
+
+
 def handler(event, context):
     logger.info(
         "ENV DOCS_BUCKET=%s AWS_REGION=%s NLP_URL=%s",
@@ -23,13 +91,15 @@ def handler(event, context):
     records = records_from_event(event)
     logger.info("Parsed %d record(s) from event", len(records))
     if not records:
-        return {"ok": False, "reason": "no-records"}
+        return {"ok": False, "reason": "no-records", "batchItemFailures": []}
 
-    processed = []
-    for r in records:
-        res = process_record(r)
-        if res and res.get("status") != "SKIPPED":
-            processed.append(res)
+    results = process_records(records)
+    processed = [res for res in results if res and res.get("status") != "SKIPPED"]
 
     logger.info("Processed %d record(s)", len(processed))
-    return {"ok": True, "processed": processed}
+    logger.info("NLP latency histogram: %s", json.dumps(nlp_latency.snapshot()))
+    return {
+        "ok": True,
+        "processed": processed,
+        "batchItemFailures": batch_item_failures(records, results),
+    }
@@ -1,26 +1,121 @@
-
+import bisect
+import gzip
 import json
+import random
+import threading
 import time
-import urllib.request
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+import urllib3
+
 from . import config
 
 logger = logging.getLogger(__name__)
 
+# statuses worth another attempt (App Runner scaling/deploying, overload)
+RETRY_STATUSES = {429, 502, 503, 504}
+BACKOFF_BASE_SECONDS = 0.25
+BACKOFF_CAP_SECONDS = 4.0
+
+
+class LatencyHistogram:
+    """Cumulative NLP call latencies (ms) for the life of this execution environment."""
+
+    BOUNDS_MS = [50, 100, 250, 500, 1000, 2500, 5000, 10000, 20000]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.total_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.BOUNDS_MS, ms)] += 1
+            self.total_ms += ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            n = sum(self.counts)
+            labels = [f"le_{b}" for b in self.BOUNDS_MS] + ["inf"]
+            return {
+                "count": n,
+                "mean_ms": round(self.total_ms / n, 1) if n else 0.0,
+                "buckets": dict(zip(labels, self.counts)),
+            }
+
+
+latency = LatencyHistogram()
+
+# created once per execution environment, so warm invocations reuse the
+# TCP/TLS connections to App Runner
+_http = urllib3.PoolManager(
+    maxsize=config.MAX_RECORD_WORKERS,
+    retries=False,
+    timeout=urllib3.Timeout(connect=5.0, read=config.NLP_TIMEOUT_SECONDS),
+)
+
+
+class NlpServiceError(Exception):
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+def _backoff(attempt: int, retry_after: Optional[str] = None) -> float:
+    if retry_after and retry_after.isdigit():
+        return min(BACKOFF_CAP_SECONDS, float(retry_after))
+    # full jitter
+    return random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt))
+
+
+def _post(url: str, body: bytes) -> Dict[str, Any]:
+    headers = {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+    last_error: Exception = NlpServiceError("no attempts made")
+    for attempt in range(config.NLP_MAX_ATTEMPTS):
+        retry_after = None
+        t0 = time.time()
+        try:
+            resp = _http.request("POST", url, body=body, headers=headers)
+        except urllib3.exceptions.ReadTimeoutError:
+            # the service is busy with it; retrying would double the wait
+            latency.observe((time.time() - t0) * 1000)
+            raise
+        except urllib3.exceptions.HTTPError as e:
+            # connection refused/reset, or a pooled keep-alive socket the
+            # server already closed
+            last_error = e
+        else:
+            dt = (time.time() - t0) * 1000
+            latency.observe(dt)
+            logger.info("NLP call %s took %.1f ms (status %d)", url, dt, resp.status)
+            if resp.status < 400:
+                return json.loads(resp.data.decode("utf-8"))
+            last_error = NlpServiceError(f"NLP service returned HTTP {resp.status}", resp.status)
+            if resp.status not in RETRY_STATUSES:
+                raise last_error
+            retry_after = resp.headers.get("Retry-After")
+        if attempt + 1 < config.NLP_MAX_ATTEMPTS:
+            delay = _backoff(attempt, retry_after)
+            logger.warning("NLP attempt %d failed (%s); retrying in %.2fs", attempt + 1, last_error, delay)
+            time.sleep(delay)
+    raise last_error
+
+
 def call_nlp_service(text: str) -> Dict[str, Any]:
     if not config.NLP_URL:
         logger.info("NLP_URL not set; skipping NLP")
         return {}
     url = config.NLP_URL.rstrip("/") + "/analyze"
     payload = json.dumps({"text": (text or "")[:200000]}).encode("utf-8")
-    req = urllib.request.Request(
-        url, data=payload, headers={"Content-Type": "application/json"}, method="POST"
-    )
-    t0 = time.time()
-    with urllib.request.urlopen(req, timeout=20) as resp:
-        body = resp.read().decode("utf-8")
-    dt = (time.time() - t0) * 1000
-    logger.info("NLP call %s took %.1f ms", url, dt)
-    result = json.loads(body)
-    return result
+    return _post(url, gzip.compress(payload, compresslevel=5))
+
+
+def call_nlp_service_batch(texts: List[str]) -> List[Dict[str, Any]]:
+    """One /analyze/batch request; results are in the order of `texts`."""
+    if not config.NLP_URL:
+        logger.info("NLP_URL not set; skipping NLP")
+        return [{} for _ in texts]
+    url = config.NLP_URL.rstrip("/") + "/analyze/batch"
+    payload = json.dumps({"texts": [(t or "")[:200000] for t in texts]}).encode("utf-8")
+    return _post(url, gzip.compress(payload, compresslevel=5))["results"]
@@ -0,0 +1,149 @@
+import io
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from multiprocessing.connection import wait
+from typing import List, Optional, Tuple, Union
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+# Lambda allots vCPUs by memory (one full vCPU per 1,769 MB); os.cpu_count()
+# reports the host's cores regardless
+LAMBDA_MB_PER_VCPU = 1769
+
+
+def available_vcpus() -> int:
+    mem_mb = os.environ.get("AWS_LAMBDA_FUNCTION_MEMORY_SIZE")
+    cpus = os.cpu_count() or 1
+    if mem_mb:
+        return max(1, min(cpus, int(mem_mb) // LAMBDA_MB_PER_VCPU))
+    return cpus
+
+
+def memory_ceiling_mb() -> int:
+    if config.PDF_MEMORY_CEILING_MB > 0:
+        return config.PDF_MEMORY_CEILING_MB
+    # default: half of the function's memory, the rest is for the parent
+    return int(os.environ.get("AWS_LAMBDA_FUNCTION_MEMORY_SIZE", "2048")) // 2
+
+
+# shared by the record threads of one invocation, so concurrent documents
+# don't start more extraction processes than there are vCPUs
+_slots = threading.BoundedSemaphore(available_vcpus())
+
+# Workers fork from a single-threaded server process rather than from this
+# one: forking while the record threads (and boto3/urllib3) hold locks can
+# leave a child deadlocked on a lock nobody will release. The server
+# imports this module (and pypdf) once and stays up across warm invocations.
+_ctx = multiprocessing.get_context("forkserver")
+_ctx.set_forkserver_preload([__name__, "pypdf"])
+
+
+def plan_workers(page_count: int, data_len: int) -> int:
+    """Worker processes worth starting for a document; <= 1 means serial."""
+    if page_count < config.PDF_PARALLEL_MIN_PAGES:
+        return 1
+    per_worker_mb = config.PDF_WORKER_MEMORY_MB + 2 * data_len / (1024 * 1024)
+    by_memory = int(memory_ceiling_mb() // per_worker_mb)
+    by_cpu = config.PDF_MAX_WORKERS or available_vcpus()
+    by_pages = page_count // 4  # not worth a process for fewer pages
+    return max(1, min(by_memory, by_cpu, by_pages))
+
+
+def _page_ranges(page_count: int, workers: int) -> List[Tuple[int, int]]:
+    step, extra = divmod(page_count, workers)
+    ranges, start = [], 0
+    for w in range(workers):
+        stop = start + step + (1 if w < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def _extract_range(source: Union[bytes, str], start: int, stop: int, conn) -> None:
+    # runs in a worker process; `source` is the PDF bytes or a path to it
+    from pypdf import PdfReader
+
+    try:
+        with open(source, "rb") if isinstance(source, str) else io.BytesIO(source) as f:
+            reader = PdfReader(f)  # reads pages from the file lazily
+            for i in range(start, stop):
+                try:
+                    text = reader.pages[i].extract_text() or ""
+                except Exception:
+                    text = ""
+                conn.send((i, text))
+    finally:
+        conn.close()
+
+
+def _acquire_slots(wanted: int) -> int:
+    got = 0
+    while got < wanted and _slots.acquire(blocking=False):
+        got += 1
+    return got
+
+
+def extract_pages_parallel(
+    source: Union[bytes, str],
+    page_count: int,
+    workers: int,
+    deadline: Optional[float] = None,
+) -> Optional[List[Optional[str]]]:
+    """
+    Extract pages [0, page_count) of `source` (PDF bytes, or a path each
+    worker opens itself) in `workers` processes over contiguous page
+    ranges. Returns one entry per page (None for pages not finished by
+    `deadline`), or None when no worker slots are free.
+
+    Uses Process + Pipe rather than Pool/Queue: those need POSIX semaphores,
+    and Lambda has no /dev/shm.
+    """
+    got = _acquire_slots(workers)
+    if got < 2:
+        for _ in range(got):
+            _slots.release()
+        return None
+
+    procs, conns = [], []
+    results: List[Optional[str]] = [None] * page_count
+    try:
+        for start, stop in _page_ranges(page_count, got):
+            recv_conn, send_conn = _ctx.Pipe(duplex=False)
+            p = _ctx.Process(
+                target=_extract_range, args=(source, start, stop, send_conn), daemon=True
+            )
+            p.start()
+            send_conn.close()  # the child holds the only write end now
+            procs.append(p)
+            conns.append(recv_conn)
+
+        pending = list(conns)
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready = wait(pending, timeout)
+            if not ready:
+                logger.warning("PDF time budget exhausted; returning partial text")
+                break
+            for conn in ready:
+                try:
+                    i, text = conn.recv()
+                except EOFError:  # worker finished (or died)
+                    pending.remove(conn)
+                    continue
+                results[i] = text
+    finally:
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+            p.join()
+        for conn in conns:
+            conn.close()
+        for _ in range(got):
+            _slots.release()
+    logger.info("Extracted %d PDF page(s) with %d worker(s)", page_count, got)
+    return results
@@ -1,12 +1,34 @@
 
 import json
 import logging
+import time
 from decimal import Decimal
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Set
 from . import config
 
 logger = logging.getLogger(__name__)
 
+DASHBOARD_STAT_ID = "dashboard"
+
+# dashboard bucket -> metadata field it counts
+DASHBOARD_FACETS = {
+    "agreement_types": "agreement_type",
+    "jurisdictions": "governing_law",
+    "industries": "industry",
+}
+
+# metadata field -> top-level attribute keying its GSI (see CoreStack)
+FACET_KEY_ATTRS = {
+    "agreement_type": "agreementType",
+    "governing_law": "governingLaw",
+    "industry": "industry",
+}
+
+# NLP codes that differ from the API's canonical vocab (docapi/filters.py)
+_CANONICAL_FACETS = {
+    "governing_law": {"AE": "UAE"},
+}
+
 def safe_val(v):
     if v is None:
         return ""
@@ -24,6 +46,264 @@ def to_dynamo_value(v):
         return v
     return json.dumps(v)
 
-def write_documents_table(item: Dict[str, Any]) -> None:
-    config.doc_table.put_item(Item=item)
+def facet_key_attrs(meta: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Canonical facet values as top-level attributes for the GSIs. Missing
+    values are left out (GSI keys cannot be empty), keeping the indexes sparse.
+    """
+    out = {}
+    for field, attr in FACET_KEY_ATTRS.items():
+        v = meta.get(field)
+        if v:
+            out[attr] = _CANONICAL_FACETS.get(field, {}).get(v, v)
+    return out
+
+# BatchGetItem / TransactWriteItems request limits
+BATCH_GET_MAX_KEYS = 100
+TRANSACT_MAX_ITEMS = 100
+TRANSACT_MAX_ATTEMPTS = 4
+
+def _client():
+    # shared by the record worker threads; boto3 resources aren't thread-safe
+    return config.dynamodb.meta.client
+
+def normalize_etag(etag: Optional[str]) -> str:
+    # GetObject returns the etag quoted, S3 event payloads don't
+    return (etag or "").strip().strip('"')
+
+def is_unchanged(document_id: str, etag: Optional[str]) -> bool:
+    """
+    True when the stored row was ingested OK from these exact bytes with
+    the current NLP_VERSION, so the object needn't be processed again.
+    """
+    if not etag:
+        return False
+    resp = _client().get_item(
+        TableName=config.DOCUMENTS_TABLE,
+        Key={"documentId": document_id},
+        ProjectionExpression="#e, #v, #m.#s",
+        ExpressionAttributeNames={
+            "#e": "etag",
+            "#v": "nlpVersion",
+            "#m": "metadata",
+            "#s": "ingestion_status",
+        },
+    )
+    stored = resp.get("Item")
+    if not stored:
+        return False
+    return (
+        normalize_etag(stored.get("etag")) == normalize_etag(etag)
+        and stored.get("nlpVersion") == config.NLP_VERSION
+        # retry documents whose NLP call failed last time
+        and (stored.get("metadata") or {}).get("ingestion_status") == "OK"
+    )
+
+def _freshness_condition(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Put condition rejecting writes older than the stored row's lastModified."""
+    if not item.get("lastModified"):
+        return {}
+    return {
+        "ConditionExpression": "attribute_not_exists(lastModified) OR lastModified <= :lm",
+        "ExpressionAttributeValues": {":lm": item["lastModified"]},
+    }
+
+def write_documents_table(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Put the item (metadata included) and return the attributes it replaced
+    (empty if new). Returns None without writing when the stored row comes
+    from a newer version of the object, so late or out-of-order events
+    can't overwrite it.
+    """
+    client = _client()
+    try:
+        resp = client.put_item(
+            TableName=config.DOCUMENTS_TABLE,
+            Item=item,
+            ReturnValues="ALL_OLD",
+            **_freshness_condition(item),
+        )
+    except client.exceptions.ConditionalCheckFailedException:
+        logger.info(
+            "Skipping stale write documentId=%s lastModified=%s",
+            item["documentId"],
+            item.get("lastModified"),
+        )
+        return None
     logger.info("Wrote DocumentsTable item documentId=%s", item["documentId"])
+    return resp.get("Attributes") or {}
+
+def write_document(item: Dict[str, Any]) -> str:
+    """Write one document and adjust the dashboard counters; returns OK or STALE."""
+    old_item = write_documents_table(item)
+    if old_item is None:
+        return "STALE"
+    # re-ingest/overwrite: move counts from the old facets to the new ones
+    update_dashboard_counters(facet_deltas(old_item.get("metadata"), item.get("metadata")))
+    return "OK"
+
+def _is_stale(item: Dict[str, Any], stored: Dict[str, Any]) -> bool:
+    new_lm, old_lm = item.get("lastModified"), stored.get("lastModified")
+    return bool(new_lm and old_lm and old_lm > new_lm)
+
+def _batch_get_stored(doc_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """documentId -> stored lastModified/metadata, for the ids that exist."""
+    table = config.DOCUMENTS_TABLE
+    out: Dict[str, Dict[str, Any]] = {}
+    for i in range(0, len(doc_ids), BATCH_GET_MAX_KEYS):
+        request = {
+            table: {
+                "Keys": [{"documentId": d} for d in doc_ids[i : i + BATCH_GET_MAX_KEYS]],
+                "ProjectionExpression": "#id, #lm, #m",
+                "ExpressionAttributeNames": {
+                    "#id": "documentId",
+                    "#lm": "lastModified",
+                    "#m": "metadata",
+                },
+            }
+        }
+        attempt = 0
+        while request:
+            if attempt:
+                time.sleep(min(1.0, 0.05 * 2**attempt))
+            resp = _client().batch_get_item(RequestItems=request)
+            for stored in resp.get("Responses", {}).get(table, []):
+                out[stored["documentId"]] = stored
+            request = resp.get("UnprocessedKeys") or None
+            attempt += 1
+    return out
+
+def _transact_put(item: Dict[str, Any]) -> Dict[str, Any]:
+    # the resource's client serializes plain Python values itself
+    return {"Put": {"TableName": config.DOCUMENTS_TABLE, "Item": item, **_freshness_condition(item)}}
+
+def _write_transaction(items: List[Dict[str, Any]]) -> Set[str]:
+    """
+    Conditionally put up to TRANSACT_MAX_ITEMS items in one TransactWriteItems
+    call; returns the documentIds rejected as stale. A failed condition
+    cancels the whole transaction, so it is retried without those items.
+    """
+    client = _client()
+    stale: Set[str] = set()
+    pending = list(items)
+    attempt = 0
+    while pending:
+        try:
+            client.transact_write_items(TransactItems=[_transact_put(i) for i in pending])
+            return stale
+        except client.exceptions.TransactionCanceledException as e:
+            reasons = e.response.get("CancellationReasons") or []
+            failed = {
+                pending[i]["documentId"]
+                for i, reason in enumerate(reasons)
+                if reason.get("Code") == "ConditionalCheckFailed"
+            }
+            if not failed:  # conflicting transaction or throttling
+                attempt += 1
+                if attempt >= TRANSACT_MAX_ATTEMPTS:
+                    raise
+                time.sleep(min(1.0, 0.05 * 2**attempt))
+                continue
+            for doc_id in failed:
+                logger.info("Skipping stale write documentId=%s", doc_id)
+            stale |= failed
+            pending = [i for i in pending if i["documentId"] not in failed]
+    return stale
+
+def write_documents_bulk(items: List[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Write many documents with BatchGetItem + TransactWriteItems (up to
+    TRANSACT_MAX_ITEMS per transaction) instead of one put per document.
+    Returns documentId -> "OK" | "STALE" | "ERROR: ...".
+
+    Every put keeps the lastModified condition of write_documents_table.
+    Transactions can't return the replaced rows, so the counter deltas come
+    from the rows read just before writing; a writer racing in between can
+    skew the dashboard counters. Transactional writes also cost twice the
+    WCU of a put, which is why this path is opt-in (BULK_WRITE_MIN_RECORDS).
+    Counters are updated after each committed chunk, so a failed chunk
+    doesn't lose the deltas of the ones before it.
+    """
+    latest: Dict[str, Dict[str, Any]] = {}
+    for item in items:  # the same object twice in one batch: keep the newest
+        cur = latest.get(item["documentId"])
+        if cur is None or not _is_stale(item, cur):
+            latest[item["documentId"]] = item
+
+    stored = _batch_get_stored(list(latest))
+    statuses: Dict[str, str] = {}
+    to_write: List[Dict[str, Any]] = []
+    for doc_id, item in latest.items():
+        if _is_stale(item, stored.get(doc_id, {})):
+            logger.info("Skipping stale write documentId=%s", doc_id)
+            statuses[doc_id] = "STALE"
+        else:
+            to_write.append(item)
+
+    for i in range(0, len(to_write), TRANSACT_MAX_ITEMS):
+        chunk = to_write[i : i + TRANSACT_MAX_ITEMS]
+        try:
+            stale = _write_transaction(chunk)
+        except Exception as e:
+            logger.exception("Bulk DocumentsTable write failed for %d item(s)", len(chunk))
+            for item in chunk:
+                statuses[item["documentId"]] = f"ERROR: {e}"
+            continue
+        deltas: Dict[str, int] = {}
+        for item in chunk:
+            doc_id = item["documentId"]
+            if doc_id in stale:
+                statuses[doc_id] = "STALE"
+                continue
+            statuses[doc_id] = "OK"
+            old = stored.get(doc_id, {})
+            for k, v in facet_deltas(old.get("metadata"), item.get("metadata")).items():
+                deltas[k] = deltas.get(k, 0) + v
+        update_dashboard_counters({k: v for k, v in deltas.items() if v})
+    logger.info("Bulk wrote %d DocumentsTable item(s)", list(statuses.values()).count("OK"))
+    return statuses
+
+def facet_deltas(old_meta: Dict[str, Any], new_meta: Dict[str, Any]) -> Dict[str, int]:
+    """Counter adjustments ("<bucket>#<value>" -> +/-1) for a metadata change."""
+    deltas: Dict[str, int] = {}
+    for bucket, field in DASHBOARD_FACETS.items():
+        old_v = (old_meta or {}).get(field)
+        new_v = (new_meta or {}).get(field)
+        if old_v == new_v:
+            continue
+        if old_v:
+            deltas[f"{bucket}#{old_v}"] = deltas.get(f"{bucket}#{old_v}", 0) - 1
+        if new_v:
+            deltas[f"{bucket}#{new_v}"] = deltas.get(f"{bucket}#{new_v}", 0) + 1
+    return {k: v for k, v in deltas.items() if v}
+
+def update_dashboard_counters(deltas: Dict[str, int]) -> None:
+    """
+    Atomically ADD the deltas to the dashboard stats item. The item is
+    seeded by the API from a full scan, so updates are skipped until then
+    rather than creating a partial counter set. Each update bumps
+    counterVersion, which the API's reconcile checks before overwriting.
+    """
+    if not deltas or not config.STATS_TABLE:
+        return
+    names, values = {"#ver": "counterVersion"}, {":one": 1}
+    clauses = ["#ver :one"]
+    for i, (attr, delta) in enumerate(sorted(deltas.items())):
+        names[f"#c{i}"] = attr
+        values[f":d{i}"] = delta
+        clauses.append(f"#c{i} :d{i}")
+    client = _client()
+    try:
+        client.update_item(
+            TableName=config.STATS_TABLE,
+            Key={"statId": DASHBOARD_STAT_ID},
+            UpdateExpression="ADD " + ", ".join(clauses),
+            ConditionExpression="attribute_exists(statId)",
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values,
+        )
+        logger.info("Dashboard counters updated: %s", deltas)
+    except client.exceptions.ConditionalCheckFailedException:
+        logger.info("Dashboard stats not seeded yet; skipping counter update")
+    except Exception as e:
+        logger.warning("Dashboard counter update failed: %s", e)
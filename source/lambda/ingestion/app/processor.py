@@ -3,18 +3,31 @@ import time
 import uuid
 import logging
 import urllib.parse
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Optional, Tuple
 from . import config
-from .s3_io import read_s3_object, is_text_artifact, build_text_key, save_text_to_s3
+from .s3_io import open_s3_object, is_text_artifact, build_text_key, save_text_to_s3
 from .extractors import normalize_ext, extract_text
 from .nlp_client import call_nlp_service
 from .heuristics import first_date, guess_title
-from .persistence import write_documents_table, to_metadata_map
+from .persistence import (
+    is_unchanged,
+    write_document,
+    to_metadata_map,
+    facet_key_attrs,
+)
 
 logger = logging.getLogger(__name__)
 
 
-def process_record(rec: Dict[str, Any]) -> Dict[str, Any]:
+def prepare_record(
+    rec: Dict[str, Any],
+    analyze: Optional[Callable[[str], Dict[str, Any]]] = None,
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Read, extract and analyze one object. Returns the result to report and
+    the DocumentsTable item to write (None when skipped or failed).
+    `analyze` replaces call_nlp_service (the backfill CLI batches calls).
+    """
     bucket = rec["bucket"]
     key_raw = rec["key"]
     key = urllib.parse.unquote_plus(key_raw)
@@ -22,28 +35,43 @@ def process_record(rec: Dict[str, Any]) -> Dict[str, Any]:
 
     if is_text_artifact(key):
         logger.info("Skipping extracted/text artifact key: %s", key)
-        return {"documentId": None, "key": key, "status": "SKIPPED"}
+        return {"documentId": None, "key": key, "status": "SKIPPED"}, None
 
     etime = rec.get("eventTime") or time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    document_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"s3://{bucket}/{key}"))
+    unchanged = {"documentId": document_id, "key": key, "status": "UNCHANGED"}
+    force = rec.get("force") or config.FORCE_REPROCESS
 
     try:
-        data, head = read_s3_object(bucket, key)
-        ext = normalize_ext(key)
-        logger.info(
-            "Head: size=%s contentType=%s ext=%s",
-            head.get("size"),
-            head.get("contentType"),
-            ext,
-        )
+        # same bytes, same pipeline version: nothing to redo
+        if not force and is_unchanged(document_id, rec.get("etag")):
+            logger.info("Unchanged since last ingestion, skipping: %s", key)
+            return unchanged, None
 
-        text, page_count = extract_text(data, ext)
+        ext = normalize_ext(key)
+        with open_s3_object(bucket, key) as (body, head):
+            logger.info(
+                "Head: size=%s contentType=%s ext=%s",
+                head.get("size"),
+                head.get("contentType"),
+                ext,
+            )
+            # events without an etag: check the one GetObject returned
+            if (
+                not force
+                and not rec.get("etag")
+                and is_unchanged(document_id, head.get("etag"))
+            ):
+                logger.info("Unchanged since last ingestion, skipping: %s", key)
+                return unchanged, None
+            text, page_count = extract_text(body, ext)
         logger.info("Extracted text length=%d", len(text))
         text_key = save_text_to_s3(bucket, key, text) if text else None
 
         nlp = {}
         try:
             if text:
-                nlp = call_nlp_service(text)
+                nlp = (analyze or call_nlp_service)(text)
             else:
                 logger.warning("No text extracted; skipping NLP")
         except Exception as e:
@@ -61,23 +89,6 @@ def process_record(rec: Dict[str, Any]) -> Dict[str, Any]:
         industry = nlp.get("industry")
         parties = nlp.get("parties") or []
 
-        document_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"s3://{bucket}/{key}"))
-
-        doc_item = {
-            "documentId": document_id,
-            "bucket": bucket,
-            "s3Key": key,
-            "mimeType": head.get("contentType"),
-            "size": head.get("size"),
-            "pageCount": page_count,
-            "textKey": text_key,
-            "createdAt": etime,
-            "lastModified": head.get("lastModified"),
-            "etag": head.get("etag"),
-            "nlpVersion": "oss-v1",
-        }
-        write_documents_table(doc_item)
-
         meta_fields = {
             "title": title,
             "agreement_type": ag_type,
@@ -92,17 +103,52 @@ def process_record(rec: Dict[str, Any]) -> Dict[str, Any]:
                 "OK" if not nlp.get("_nlp_error") else f"NLP_ERROR: {nlp['_nlp_error']}"
             ),
         }
+        metadata = to_metadata_map(meta_fields)
 
-        config.doc_table.update_item(
-            Key={"documentId": document_id},
-            UpdateExpression="SET #m = :m",
-            ExpressionAttributeNames={"#m": "metadata"},
-            ExpressionAttributeValues={":m": to_metadata_map(meta_fields)},
-        )
-
-        return {"documentId": document_id, "key": key, "status": "OK"}
+        # written on every put: the API refreshes its metadata index from
+        # the byUpdatedAt GSI (updatedDay partitions, updatedAt sort key)
+        updated_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        doc_item = {
+            "documentId": document_id,
+            "bucket": bucket,
+            "s3Key": key,
+            "mimeType": head.get("contentType"),
+            "size": head.get("size"),
+            "pageCount": page_count,
+            "textKey": text_key,
+            "createdAt": etime,
+            "updatedAt": updated_at,
+            "updatedDay": updated_at[:10],
+            "lastModified": head.get("lastModified"),
+            "etag": head.get("etag"),
+            "nlpVersion": config.NLP_VERSION,
+            "metadata": metadata,
+            **facet_key_attrs(meta_fields),
+        }
+        result = {
+            "documentId": document_id,
+            "key": key,
+            "status": "OK",
+            # OK or NLP_ERROR: ...; the row is written either way
+            "ingestionStatus": meta_fields["ingestion_status"],
+        }
+        return result, doc_item
 
     except Exception as e:
         logger.exception("Ingestion error for key=%s: %s", key, e)
         document_id = str(uuid.uuid4())
-        return {"documentId": document_id, "key": key, "status": f"ERROR: {e}"}
+        return {"documentId": document_id, "key": key, "status": f"ERROR: {e}"}, None
+
+
+def process_record(
+    rec: Dict[str, Any],
+    analyze: Optional[Callable[[str], Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    result, doc_item = prepare_record(rec, analyze)
+    if doc_item is None:
+        return result
+    try:
+        return {**result, "status": write_document(doc_item)}
+    except Exception as e:
+        logger.exception("DocumentsTable write failed for key=%s: %s", result["key"], e)
+        return {**result, "status": f"ERROR: {e}"}
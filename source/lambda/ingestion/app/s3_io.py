@@ -1,25 +1,47 @@
 
 import io
+import tempfile
 import zipfile
-from typing import Dict, Any, Tuple
+from contextlib import contextmanager
+from typing import BinaryIO, Dict, Any, Iterator, Optional, Tuple
 import logging
 from . import config
 
 logger = logging.getLogger(__name__)
 
-def read_s3_object(bucket: str, key: str) -> Tuple[bytes, Dict[str, Any]]:
-    head = config.s3.head_object(Bucket=bucket, Key=key)
-    obj = config.s3.get_object(Bucket=bucket, Key=key)
-    body = obj["Body"].read()
-    meta = {
-        "size": head.get("ContentLength", 0),
-        "contentType": head.get("ContentType") or "",
+_READ_CHUNK = 1024 * 1024
+
+def _object_meta(obj: Dict[str, Any]) -> Dict[str, Any]:
+    # GetObject returns the same headers as HeadObject, so one request is enough
+    return {
+        "size": obj.get("ContentLength", 0),
+        "contentType": obj.get("ContentType") or "",
         "lastModified": (
-            head.get("LastModified").isoformat() if head.get("LastModified") else None
+            obj.get("LastModified").isoformat() if obj.get("LastModified") else None
         ),
-        "etag": head.get("ETag"),
+        "etag": obj.get("ETag"),
     }
-    return body, meta
+
+@contextmanager
+def open_s3_object(
+    bucket: str, key: str, spool_max_bytes: Optional[int] = None
+) -> Iterator[Tuple[BinaryIO, Dict[str, Any]]]:
+    """
+    Stream an object into a seekable file: kept in memory up to
+    `spool_max_bytes`, spilled to a temp file under /tmp beyond that.
+    The file is removed when the block exits.
+    """
+    if spool_max_bytes is None:
+        spool_max_bytes = config.S3_SPOOL_MAX_BYTES
+    obj = config.s3.get_object(Bucket=bucket, Key=key)
+    meta = _object_meta(obj)
+    with tempfile.SpooledTemporaryFile(max_size=spool_max_bytes) as f:
+        for chunk in obj["Body"].iter_chunks(_READ_CHUNK):
+            f.write(chunk)
+        if (meta["size"] or 0) > spool_max_bytes:
+            logger.info("Spooled %s bytes of s3://%s/%s to disk", meta["size"], bucket, key)
+        f.seek(0)
+        yield f, meta
 
 def is_text_artifact(key: str) -> bool:
     return key.startswith(config.TEXT_PREFIX) or key.endswith(".txt")
@@ -0,0 +1,280 @@
+"""
+Re-ingest every object under a bucket prefix through the Lambda's pipeline.
+
+    python backfill.py --bucket <docs-bucket> --table <documents-table> \\
+        --stats-table <stats-table> --nlp-url https://<nlp-service> \\
+        --workers 16 --rate 20 --nlp-version oss-v2
+
+Records run through process_record on a thread pool. NLP calls from all
+workers are coalesced into /analyze/batch requests (falling back to
+/analyze on services without it) and throttled to --rate documents/s.
+Finished keys are appended to a checkpoint file, so an interrupted run
+resumes where it stopped; failed keys (including documents written
+without NLP fields because the NLP call failed) are retried on the next run.
+"""
+import argparse
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Set
+
+logger = logging.getLogger("backfill")
+
+# statuses that don't need another attempt on resume
+DONE_STATUSES = ("OK", "UNCHANGED", "STALE", "SKIPPED")
+
+
+class RateLimiter:
+    """Token bucket: at most `rate` units per second (0 = unlimited)."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._tokens = rate
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, n: int = 1) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    max(self.rate, n), self._tokens + (now - self._last) * self.rate
+                )
+                self._last = now
+                if self._tokens >= n:
+                    self._tokens -= n
+                    return
+                wait = (n - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class BatchingAnalyzer:
+    """
+    Callable drop-in for call_nlp_service: worker threads block on their
+    own result while a collector thread sends whatever texts arrived within
+    `max_wait_ms` (up to `max_batch`) as one /analyze/batch request.
+    """
+
+    def __init__(self, limiter: RateLimiter, max_batch: int = 8, max_wait_ms: float = 50.0):
+        from app import nlp_client
+
+        self._nlp = nlp_client
+        self.limiter = limiter
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000.0
+        self.batch_supported = max_batch > 1
+        self._queue: "queue.Queue" = queue.Queue()
+        threading.Thread(target=self._loop, name="nlp-batcher", daemon=True).start()
+
+    def __call__(self, text: str) -> Dict[str, Any]:
+        fut: Future = Future()
+        self._queue.put((text, fut))
+        return fut.result()
+
+    def _collect(self) -> List:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _analyze(self, texts: List[str]) -> List[Dict[str, Any]]:
+        if self.batch_supported:
+            try:
+                return self._nlp.call_nlp_service_batch(texts)
+            except self._nlp.NlpServiceError as e:
+                if e.status not in (404, 405):
+                    raise
+                logger.warning("NLP service has no /analyze/batch; using /analyze")
+                self.batch_supported = False
+        return [self._nlp.call_nlp_service(t) for t in texts]
+
+    def _loop(self) -> None:
+        while True:
+            batch = self._collect()
+            self.limiter.acquire(len(batch))
+            try:
+                results = self._analyze([t for t, _ in batch])
+            except Exception as e:
+                for _, fut in batch:
+                    fut.set_exception(e)
+                continue
+            for (_, fut), result in zip(batch, results):
+                fut.set_result(result)
+
+
+def checkpoint_status(res: Dict[str, Any]) -> str:
+    """A process_record result as a checkpoint status (see DONE_STATUSES)."""
+    status = str(res.get("status", "ERROR")).split(":")[0]
+    if status == "OK" and str(res.get("ingestionStatus", "")).startswith("NLP_ERROR"):
+        # the row was written without NLP fields; retry it on the next run
+        return "NLP_ERROR"
+    return status
+
+
+class Checkpoint:
+    """Append-only JSON lines of finished keys."""
+
+    def __init__(self, path: str, reset: bool = False):
+        self.path = path
+        self.done: Set[str] = set()
+        if reset and os.path.exists(path):
+            os.remove(path)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:  # torn last line after a crash
+                        continue
+                    if entry.get("status") in DONE_STATUSES:
+                        self.done.add(entry["key"])
+        self._f = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def record(self, key: str, status: str) -> None:
+        with self._lock:
+            self._f.write(json.dumps({"key": key, "status": status}) + "\n")
+            self._f.flush()
+
+    def close(self) -> None:
+        self._f.close()
+
+
+def iter_records(s3, bucket: str, prefix: str, force: bool) -> Iterator[Dict[str, Any]]:
+    paginator = s3.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            yield {
+                "bucket": bucket,
+                # process_record unquotes keys the way S3 events encode them
+                "key": urllib.parse.quote_plus(obj["Key"], safe="/"),
+                "rawKey": obj["Key"],
+                "etag": obj.get("ETag"),
+                "eventTime": obj["LastModified"].strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "force": force,
+            }
+
+
+def _configure_env(args) -> None:
+    # app.config reads these at import time
+    os.environ["DOCS_BUCKET"] = args.bucket
+    os.environ["DOCUMENTS_TABLE"] = args.table
+    os.environ["MAX_RECORD_WORKERS"] = str(args.workers)
+    optional = {
+        "STATS_TABLE": args.stats_table,
+        "NLP_URL": args.nlp_url,
+        "AWS_REGION": args.region,
+        "NLP_VERSION": args.nlp_version,
+    }
+    for name, value in optional.items():
+        if value:
+            os.environ[name] = value
+
+
+def run(args) -> Counter:
+    _configure_env(args)
+    from app import config
+    from app.processor import process_record
+
+    checkpoint = Checkpoint(
+        args.checkpoint or f"backfill-{args.bucket}.checkpoint", reset=args.reset
+    )
+    analyze = BatchingAnalyzer(RateLimiter(args.rate), args.batch_size, args.batch_wait_ms)
+    statuses: Counter = Counter()
+    started = time.monotonic()
+    last_report = started
+    lock = threading.Lock()
+
+    def work(rec: Dict[str, Any]) -> None:
+        nonlocal last_report
+        try:
+            res = process_record(rec, analyze)
+        except Exception as e:  # process_record reports its own errors; last resort
+            logger.exception("Failed on %s", rec["rawKey"])
+            res = {"status": f"ERROR: {e}"}
+        status = checkpoint_status(res)
+        checkpoint.record(rec["rawKey"], status)
+        with lock:
+            statuses[status] += 1
+            now = time.monotonic()
+            if now - last_report >= args.report_every:
+                last_report = now
+                n = sum(statuses.values())
+                logger.info(
+                    "%d docs, %.2f docs/s, %s", n, n / (now - started), dict(statuses)
+                )
+
+    records = iter_records(config.s3, args.bucket, args.prefix, args.force)
+    skipped = 0
+    # bounded in-flight window so listing doesn't run ahead of the workers
+    window = threading.BoundedSemaphore(args.workers * 4)
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for i, rec in enumerate(records):
+            if args.limit and i >= args.limit:
+                break
+            if rec["rawKey"] in checkpoint.done:
+                skipped += 1
+                continue
+            window.acquire()
+            fut = pool.submit(work, rec)
+            fut.add_done_callback(lambda f: window.release())
+    checkpoint.close()
+
+    elapsed = time.monotonic() - started
+    n = sum(statuses.values())
+    logger.info(
+        "Done: %d docs in %.1fs (%.2f docs/s), %d already done, %s",
+        n,
+        elapsed,
+        n / elapsed if elapsed else 0.0,
+        skipped,
+        dict(statuses),
+    )
+    return statuses
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bucket", required=True)
+    parser.add_argument("--table", required=True, help="DocumentsTable name")
+    parser.add_argument("--stats-table", default="", help="StatsTable name (dashboard counters)")
+    parser.add_argument("--nlp-url", default="")
+    parser.add_argument("--region", default="")
+    parser.add_argument("--prefix", default="uploads/")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=8, help="texts per /analyze/batch; 1 disables batching")
+    parser.add_argument("--batch-wait-ms", type=float, default=50.0)
+    parser.add_argument("--rate", type=float, default=0.0, help="max documents/s sent to the NLP service (0 = unlimited)")
+    parser.add_argument("--nlp-version", default="", help="stamp rows with this NLP_VERSION; rows already at it are skipped")
+    parser.add_argument("--force", action="store_true", help="reprocess even unchanged objects")
+    parser.add_argument("--checkpoint", default="", help="default: backfill-<bucket>.checkpoint")
+    parser.add_argument("--reset", action="store_true", help="ignore and truncate the checkpoint")
+    parser.add_argument("--limit", type=int, default=0, help="stop after this many listed objects")
+    parser.add_argument("--report-every", type=float, default=10.0, help="seconds between progress lines")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    for noisy in ("app", "botocore", "urllib3"):
+        logging.getLogger(noisy).setLevel(logging.WARNING)
+    statuses = run(args)
+    sys.exit(1 if statuses.get("ERROR") or statuses.get("NLP_ERROR") else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# app.config reads these at import time
+os.environ.setdefault("DOCUMENTS_TABLE", "documents-test")
+os.environ.setdefault("DOCS_BUCKET", "docs-test")
+os.environ.setdefault("AWS_DEFAULT_REGION", "eu-central-1")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
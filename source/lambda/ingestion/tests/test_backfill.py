@@ -0,0 +1,20 @@
+from backfill import Checkpoint, checkpoint_status
+
+
+def test_nlp_errors_are_not_checkpointed_as_done(tmp_path):
+    path = str(tmp_path / "run.checkpoint")
+    cp = Checkpoint(path)
+    results = {
+        "ok.pdf": {"status": "OK", "ingestionStatus": "OK"},
+        "nlp.pdf": {"status": "OK", "ingestionStatus": "NLP_ERROR: 503 Service Unavailable"},
+        "same.pdf": {"status": "UNCHANGED"},
+        "old.pdf": {"status": "STALE"},
+        "broken.pdf": {"status": "ERROR: AccessDenied"},
+    }
+    for key, res in results.items():
+        cp.record(key, checkpoint_status(res))
+    cp.close()
+
+    assert checkpoint_status(results["nlp.pdf"]) == "NLP_ERROR"
+    assert checkpoint_status(results["broken.pdf"]) == "ERROR"
+    assert Checkpoint(path).done == {"ok.pdf", "same.pdf", "old.pdf"}
@@ -0,0 +1,100 @@
+import json
+
+from app.events import _records_from_sqs_message, records_from_event
+from app.lambda_function import batch_item_failures
+
+
+# ---------- helpers ----------
+
+
+def _eventbridge(key, etag="abc"):
+    return {
+        "source": "aws.s3",
+        "time": "2024-05-01T10:00:00Z",
+        "detail": {"bucket": {"name": "docs"}, "object": {"key": key, "etag": etag}},
+    }
+
+
+def _s3_notification(*keys):
+    return {
+        "Records": [
+            {
+                "eventTime": "2024-05-01T10:00:00Z",
+                "s3": {"bucket": {"name": "docs"}, "object": {"key": k, "eTag": "e"}},
+            }
+            for k in keys
+        ]
+    }
+
+
+def _sqs(msg_id, body):
+    return {
+        "eventSource": "aws:sqs",
+        "messageId": msg_id,
+        "body": body if isinstance(body, str) else json.dumps(body),
+    }
+
+
+# ---------- tests ----------
+
+
+def test_sqs_message_with_eventbridge_body():
+    recs = _records_from_sqs_message(_sqs("m1", _eventbridge("uploads/a.pdf")))
+    assert recs == [
+        {
+            "bucket": "docs",
+            "key": "uploads/a.pdf",
+            "etag": "abc",
+            "eventTime": "2024-05-01T10:00:00Z",
+            "messageId": "m1",
+        }
+    ]
+
+
+def test_sqs_message_with_s3_notification_body_keeps_every_record():
+    recs = _records_from_sqs_message(_sqs("m2", _s3_notification("a.pdf", "b.pdf")))
+    assert [r["key"] for r in recs] == ["a.pdf", "b.pdf"]
+    assert {r["messageId"] for r in recs} == {"m2"}
+
+
+def test_unparseable_or_non_object_bodies_are_dropped():
+    assert _records_from_sqs_message(_sqs("m3", "not json")) == []
+    assert _records_from_sqs_message({"messageId": "m4"}) == []
+    assert _records_from_sqs_message(_sqs("m5", [1, 2])) == []
+
+
+def test_sqs_batch_event_flattens_messages_in_order():
+    event = {
+        "Records": [
+            _sqs("m1", _eventbridge("a.pdf")),
+            _sqs("m2", "garbage"),
+            _sqs("m3", _eventbridge("b.pdf")),
+        ]
+    }
+    recs = records_from_event(event)
+    assert [(r["messageId"], r["key"]) for r in recs] == [("m1", "a.pdf"), ("m3", "b.pdf")]
+
+
+def test_batch_item_failures_reports_each_failed_message_once():
+    records = [
+        {"messageId": "m1"},
+        {"messageId": "m2"},
+        {"messageId": "m2"},  # one S3 notification with two objects
+        {"messageId": "m3"},
+        {},  # direct EventBridge invocation: nothing to report
+    ]
+    results = [
+        {"status": "OK"},
+        {"status": "ERROR: boom"},
+        {"status": "ERROR: again"},
+        {"status": "STALE"},
+        {"status": "ERROR: no message"},
+    ]
+    assert batch_item_failures(records, results) == [{"itemIdentifier": "m2"}]
+
+
+def test_batch_item_failures_treats_missing_results_as_ok():
+    records = [{"messageId": "m1"}, {"messageId": "m2"}]
+    assert batch_item_failures(records, [None, {"status": "ERROR"}]) == [
+        {"itemIdentifier": "m2"}
+    ]
@@ -0,0 +1,142 @@
+import io
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app import config, processor
+from app.persistence import is_unchanged
+
+
+# ---------- helpers / fakes ----------
+
+
+class FakeDocClient:
+    def __init__(self, item=None):
+        self.item = item
+        self.reads = 0
+
+    def get_item(self, TableName, Key, **kwargs):
+        self.reads += 1
+        return {"Item": self.item} if self.item else {}
+
+
+def _stored(etag='"abc"', version=None, status="OK"):
+    return {
+        "etag": etag,
+        "nlpVersion": version or config.NLP_VERSION,
+        "metadata": {"ingestion_status": status},
+    }
+
+
+@pytest.fixture
+def table(monkeypatch):
+    t = FakeDocClient(_stored())
+    monkeypatch.setattr(config, "dynamodb", SimpleNamespace(meta=SimpleNamespace(client=t)))
+    monkeypatch.setattr(config, "FORCE_REPROCESS", False)
+    return t
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    """Fake S3 read returning a small markdown document; records each open."""
+    opened = []
+
+    @contextmanager
+    def fake_open(bucket, key, spool_max_bytes=None):
+        opened.append(key)
+        yield io.BytesIO(b"# Mutual NDA\nbetween Acme and Globex"), {
+            "etag": '"abc"',
+            "size": 36,
+            "contentType": "text/markdown",
+            "lastModified": "2024-05-01T10:00:00Z",
+        }
+
+    monkeypatch.setattr(processor, "open_s3_object", fake_open)
+    monkeypatch.setattr(processor, "save_text_to_s3", lambda bucket, key, text: "extracted/x.txt")
+    return opened
+
+
+def _rec(**extra):
+    return {"bucket": "docs", "key": "uploads/nda.md", **extra}
+
+
+def _analyze(text):
+    return {"agreement_type": "NDA"}
+
+
+# ---------- is_unchanged ----------
+
+
+@pytest.mark.parametrize("etag", ["abc", '"abc"', ' "abc" '])
+def test_quoted_and_unquoted_etags_match(table, etag):
+    assert is_unchanged("doc", etag) is True
+
+
+def test_different_etag_is_changed(table):
+    assert is_unchanged("doc", "def") is False
+
+
+def test_nlp_version_bump_reprocesses(table):
+    table.item = _stored(version="an-older-version")
+    assert is_unchanged("doc", "abc") is False
+
+
+def test_failed_nlp_call_is_retried(table):
+    table.item = _stored(status="NLP_ERROR: 503")
+    assert is_unchanged("doc", "abc") is False
+
+
+def test_missing_row_or_etag(table):
+    assert is_unchanged("doc", None) is False
+    assert table.reads == 0  # no etag, no read
+    table.item = None
+    assert is_unchanged("doc", "abc") is False
+
+
+# ---------- processor pre-check ----------
+
+
+def test_unchanged_event_skips_the_s3_read(table, s3):
+    result, item = processor.prepare_record(_rec(etag="abc"), _analyze)
+    assert result["status"] == "UNCHANGED"
+    assert item is None
+    assert s3 == []
+
+
+def test_force_reprocesses_unchanged_objects(table, s3, monkeypatch):
+    result, item = processor.prepare_record(_rec(etag="abc", force=True), _analyze)
+    assert result["status"] == "OK"
+    assert item["metadata"]["agreement_type"] == "NDA"
+    assert table.reads == 0
+
+    monkeypatch.setattr(config, "FORCE_REPROCESS", True)
+    assert processor.prepare_record(_rec(etag="abc"), _analyze)[0]["status"] == "OK"
+
+
+def test_etagless_event_checks_the_etag_from_get_object(table, s3):
+    result, item = processor.prepare_record(_rec(), _analyze)
+    assert result["status"] == "UNCHANGED"
+    assert item is None
+    assert s3 == ["uploads/nda.md"]  # read once, then skipped before extraction
+
+
+def test_changed_object_is_processed_and_stamped(table, s3):
+    table.item = _stored(etag='"old"')
+    result, item = processor.prepare_record(_rec(), _analyze)
+    assert result["status"] == "OK"
+    assert result["ingestionStatus"] == "OK"
+    assert item["etag"] == '"abc"'
+    assert item["nlpVersion"] == config.NLP_VERSION
+
+
+def test_failed_nlp_call_is_reported_in_the_result(table, s3):
+    table.item = None
+
+    def failing(text):
+        raise RuntimeError("NLP service returned 503")
+
+    result, item = processor.prepare_record(_rec(), failing)
+    assert result["status"] == "OK"  # the row is still written
+    assert result["ingestionStatus"].startswith("NLP_ERROR")
+    assert item["metadata"]["ingestion_status"] == result["ingestionStatus"]
@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+
+from app import config, lambda_function
+from app.lambda_function import batch_item_failures, process_records
+
+
+# ---------- helpers / fakes ----------
+
+
+class SlowProcessor:
+    """process_record stand-in: earlier records finish last; "bad" raises."""
+
+    def __init__(self, n):
+        self.n = n
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def __call__(self, rec):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            time.sleep(0.02 * (self.n - rec["i"]))
+            if rec["key"] == "bad":
+                raise ValueError("malformed record")
+            return {"documentId": rec["key"], "key": rec["key"], "status": "OK"}
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+def _records(keys):
+    return [{"i": i, "key": k, "messageId": f"m{i}"} for i, k in enumerate(keys)]
+
+
+@pytest.fixture
+def slow(monkeypatch):
+    monkeypatch.setattr(config, "MAX_RECORD_WORKERS", 4)
+    monkeypatch.setattr(config, "BULK_WRITE_MIN_RECORDS", 0)
+    proc = SlowProcessor(6)
+    monkeypatch.setattr(lambda_function, "process_record", proc)
+    return proc
+
+
+# ---------- tests ----------
+
+
+def test_results_keep_record_order_when_finishing_out_of_order(slow):
+    keys = ["a", "b", "c", "d", "e", "f"]
+
+    results = process_records(_records(keys))
+
+    assert [r["key"] for r in results] == keys
+    assert all(r["status"] == "OK" for r in results)
+    assert 1 < slow.max_running <= 4
+
+
+def test_failing_record_is_isolated(slow):
+    records = _records(["a", "bad", "c"])
+
+    results = process_records(records)
+
+    assert [r["status"] for r in results[::2]] == ["OK", "OK"]
+    assert results[1]["key"] == "bad"
+    assert results[1]["status"] == "ERROR: malformed record"
+    assert batch_item_failures(records, results) == [{"itemIdentifier": "m1"}]
+
+
+def test_bulk_path_keeps_record_order(monkeypatch):
+    monkeypatch.setattr(config, "MAX_RECORD_WORKERS", 4)
+    monkeypatch.setattr(config, "BULK_WRITE_MIN_RECORDS", 2)
+
+    def prepare(rec):
+        time.sleep(0.01 * (3 - rec["i"]))
+        if rec["key"] == "skip":
+            return {"key": "skip", "status": "UNCHANGED"}, None
+        return {"documentId": rec["key"], "key": rec["key"]}, {"documentId": rec["key"]}
+
+    monkeypatch.setattr(lambda_function, "prepare_record", prepare)
+    monkeypatch.setattr(
+        lambda_function,
+        "write_documents_bulk",
+        lambda items: {"a": "OK", "c": "STALE"},
+    )
+
+    results = process_records(_records(["a", "skip", "c"]))
+
+    assert [(r["key"], r["status"]) for r in results] == [
+        ("a", "OK"),
+        ("skip", "UNCHANGED"),
+        ("c", "STALE"),
+    ]
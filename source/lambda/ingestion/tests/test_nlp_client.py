@@ -0,0 +1,125 @@
+import gzip
+import json
+from types import SimpleNamespace
+
+import pytest
+import urllib3
+
+from app import config, nlp_client
+from app.nlp_client import LatencyHistogram, NlpServiceError, call_nlp_service
+
+
+# ---------- helpers / fakes ----------
+
+
+def _resp(status, body=None, headers=None):
+    return SimpleNamespace(
+        status=status, data=json.dumps(body or {}).encode(), headers=headers or {}
+    )
+
+
+class FakeHttp:
+    """PoolManager stand-in replaying `replies` (responses or exceptions)."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.bodies = []
+
+    def request(self, method, url, body=None, headers=None):
+        self.bodies.append(json.loads(gzip.decompress(body)))
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+@pytest.fixture
+def http(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(config, "NLP_URL", "https://nlp.example")
+    monkeypatch.setattr(config, "NLP_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(nlp_client, "latency", LatencyHistogram())
+    monkeypatch.setattr(nlp_client.time, "sleep", sleeps.append)
+
+    def _use(*replies):
+        fake = FakeHttp(*replies)
+        monkeypatch.setattr(nlp_client, "_http", fake)
+        return fake, sleeps
+
+    return _use
+
+
+# ---------- tests ----------
+
+
+def test_unavailable_is_retried_then_returns(http):
+    fake, sleeps = http(_resp(503), _resp(200, {"title": "NDA"}))
+
+    assert call_nlp_service("text") == {"title": "NDA"}
+    assert len(fake.bodies) == 2
+    assert fake.bodies[0] == {"text": "text"}
+    assert len(sleeps) == 1
+
+
+def test_client_error_is_not_retried(http):
+    fake, sleeps = http(_resp(400), _resp(200))
+
+    with pytest.raises(NlpServiceError) as exc:
+        call_nlp_service("text")
+
+    assert exc.value.status == 400
+    assert len(fake.bodies) == 1
+    assert sleeps == []
+
+
+def test_numeric_retry_after_is_honoured_and_capped(http):
+    fake, sleeps = http(
+        _resp(429, headers={"Retry-After": "2"}),
+        _resp(503, headers={"Retry-After": "120"}),
+        _resp(200, {"title": "NDA"}),
+    )
+
+    call_nlp_service("text")
+
+    assert sleeps == [2.0, nlp_client.BACKOFF_CAP_SECONDS]
+
+
+def test_read_timeout_is_not_retried(http):
+    fake, sleeps = http(
+        urllib3.exceptions.ReadTimeoutError(None, "/analyze", "read timed out"), _resp(200)
+    )
+
+    with pytest.raises(urllib3.exceptions.ReadTimeoutError):
+        call_nlp_service("text")
+
+    assert len(fake.bodies) == 1
+    assert nlp_client.latency.snapshot()["count"] == 1
+
+
+def test_gives_up_after_max_attempts(http, monkeypatch):
+    monkeypatch.setattr(config, "NLP_MAX_ATTEMPTS", 2)
+    fake, sleeps = http(
+        urllib3.exceptions.ProtocolError("connection reset"), _resp(502), _resp(200)
+    )
+
+    with pytest.raises(NlpServiceError) as exc:
+        call_nlp_service("text")
+
+    assert exc.value.status == 502
+    assert len(fake.bodies) == 2
+    assert len(sleeps) == 1
+
+
+def test_histogram_buckets_are_upper_bounds():
+    h = LatencyHistogram()
+    for ms in (10, 50, 51, 20000, 20001):
+        h.observe(ms)
+
+    snap = h.snapshot()
+
+    assert snap["count"] == 5
+    assert snap["buckets"]["le_50"] == 2
+    assert snap["buckets"]["le_100"] == 1
+    assert snap["buckets"]["le_20000"] == 1
+    assert snap["buckets"]["inf"] == 1
+    assert snap["mean_ms"] == round((10 + 50 + 51 + 20000 + 20001) / 5, 1)
@@ -0,0 +1,93 @@
+import tempfile
+import threading
+
+import pytest
+
+pytest.importorskip("pypdf")
+
+from app import config, extractors, pdf_parallel
+
+
+# ---------- helpers ----------
+
+
+def _make_pdf(pages: int) -> bytes:
+    """A minimal text PDF with a few distinct lines per page."""
+    objs = [b"<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(pages))
+    objs.append(f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode())
+    font = 3 + 2 * pages
+    for i in range(pages):
+        objs.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font} 0 R >> >> /Contents {4 + 2 * i} 0 R >>".encode()
+        )
+        stream = "".join(
+            f"BT /F1 10 Tf 20 {780 - 12 * j} Td (Page {i} line {j}) Tj ET\n" for j in range(5)
+        ).encode()
+        objs.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"endstream")
+    objs.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for n, obj in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % n + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref)
+    return bytes(out)
+
+
+@pytest.fixture
+def parallel(monkeypatch):
+    # force 4 workers whatever the host's vCPUs
+    monkeypatch.setattr(pdf_parallel, "_slots", threading.BoundedSemaphore(4))
+    monkeypatch.setattr(config, "PDF_MAX_WORKERS", 4)
+    monkeypatch.setattr(config, "PDF_MEMORY_CEILING_MB", 4096)
+    monkeypatch.setattr(config, "PDF_PARALLEL_MIN_PAGES", 16)
+
+
+def _serial(data):
+    saved = config.PDF_PARALLEL_MIN_PAGES
+    config.PDF_PARALLEL_MIN_PAGES = 10**9
+    try:
+        return extractors.extract_text(data, "pdf")
+    finally:
+        config.PDF_PARALLEL_MIN_PAGES = saved
+
+
+# ---------- tests ----------
+
+
+def test_parallel_matches_serial_for_bytes(parallel):
+    data = _make_pdf(40)
+    assert pdf_parallel.plan_workers(40, len(data)) == 4
+    serial = _serial(data)
+    assert serial[1] == 40
+    assert "Page 39 line 4" in serial[0]
+    assert extractors.extract_text(data, "pdf") == serial
+
+
+@pytest.mark.parametrize("max_size", [10**9, 10], ids=["in-memory", "rolled-over"])
+def test_parallel_matches_serial_for_spooled_files(parallel, max_size):
+    data = _make_pdf(40)
+    with tempfile.SpooledTemporaryFile(max_size=max_size) as f:
+        f.write(data)
+        assert extractors.extract_text(f, "pdf") == _serial(data)
+
+
+def test_parallel_workers_read_named_files_by_path(parallel, tmp_path):
+    data = _make_pdf(24)
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(data)
+    with open(path, "rb") as f:
+        assert extractors._worker_source(f) == str(path)
+        assert extractors.extract_text(f, "pdf") == _serial(data)
+
+
+def test_slots_are_released(parallel):
+    extractors.extract_text(_make_pdf(20), "pdf")
+    assert pdf_parallel._acquire_slots(4) == 4
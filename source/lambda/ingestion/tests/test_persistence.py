@@ -0,0 +1,214 @@
+from types import SimpleNamespace
+
+import pytest
+from botocore.exceptions import ClientError
+
+from app import config, persistence
+from app.persistence import write_document, write_documents_bulk
+
+
+# ---------- helpers / fakes ----------
+
+
+class ConditionalCheckFailedException(ClientError):
+    pass
+
+
+class TransactionCanceledException(ClientError):
+    pass
+
+
+def _error(cls, code, reasons=None):
+    response = {"Error": {"Code": code}}
+    if reasons is not None:
+        response["CancellationReasons"] = reasons
+    return cls(response, "Op")
+
+
+EXCEPTIONS = SimpleNamespace(
+    ConditionalCheckFailedException=ConditionalCheckFailedException,
+    TransactionCanceledException=TransactionCanceledException,
+)
+
+
+class FakeClient:
+    """
+    DynamoDB client stand-in. Transactions reject `stale` ids, then replay
+    `failures` (None = success); puts replace `replaced` unless `put_stale`.
+    """
+
+    exceptions = EXCEPTIONS
+
+    def __init__(self, stale=(), failures=(), stored=None, replaced=None, put_stale=False):
+        self.stale = set(stale)
+        self.failures = list(failures)
+        self.stored = stored or {}
+        self.replaced = replaced or {}
+        self.put_stale = put_stale
+        self.calls = []
+        self.puts = []
+        self.updates = []
+
+    def transact_write_items(self, TransactItems):
+        ids = [t["Put"]["Item"]["documentId"] for t in TransactItems]
+        self.calls.append(ids)
+        reasons = [
+            {"Code": "ConditionalCheckFailed" if i in self.stale else "None"} for i in ids
+        ]
+        if any(r["Code"] != "None" for r in reasons):
+            raise _error(TransactionCanceledException, "TransactionCanceledException", reasons)
+        failure = self.failures.pop(0) if self.failures else None
+        if failure is not None:
+            raise failure
+        return {}
+
+    def batch_get_item(self, RequestItems):
+        return {"Responses": {config.DOCUMENTS_TABLE: list(self.stored.values())}}
+
+    def put_item(self, TableName, Item, ReturnValues=None, **kwargs):
+        self.puts.append((TableName, Item, kwargs))
+        if self.put_stale:
+            raise _error(ConditionalCheckFailedException, "ConditionalCheckFailedException")
+        return {"Attributes": self.replaced}
+
+    def update_item(self, TableName, **kwargs):
+        self.updates.append(kwargs)
+        return {}
+
+
+@pytest.fixture
+def counters(monkeypatch):
+    updates = []
+    monkeypatch.setattr(persistence, "update_dashboard_counters", updates.append)
+    monkeypatch.setattr(persistence.time, "sleep", lambda s: None)
+    return updates
+
+
+def _use(monkeypatch, client):
+    monkeypatch.setattr(config, "dynamodb", SimpleNamespace(meta=SimpleNamespace(client=client)))
+
+
+def _doc(doc_id, lm="2024-05-02T00:00:00+00:00", agreement="NDA"):
+    return {"documentId": doc_id, "lastModified": lm, "metadata": {"agreement_type": agreement}}
+
+
+# ---------- single put ----------
+
+
+def test_single_put_replaces_older_row_and_moves_counters(monkeypatch, counters):
+    client = FakeClient(replaced={"metadata": {"agreement_type": "MSA"}})
+    _use(monkeypatch, client)
+
+    assert write_document(_doc("a")) == "OK"
+    table, _, condition = client.puts[0]
+    assert table == config.DOCUMENTS_TABLE
+    assert condition["ExpressionAttributeValues"] == {
+        ":lm": "2024-05-02T00:00:00+00:00"
+    }
+    assert counters == [{"agreement_types#MSA": -1, "agreement_types#NDA": 1}]
+
+
+def test_single_put_condition_failure_is_stale(monkeypatch, counters):
+    _use(monkeypatch, FakeClient(put_stale=True))
+    assert write_document(_doc("a")) == "STALE"
+    assert counters == []
+
+
+# ---------- bulk ----------
+
+
+def test_bulk_drops_stale_item_and_retries_the_transaction(monkeypatch, counters):
+    client = FakeClient(stale={"b"})
+    _use(monkeypatch, client)
+
+    statuses = write_documents_bulk([_doc("a"), _doc("b"), _doc("c")])
+
+    assert statuses == {"a": "OK", "b": "STALE", "c": "OK"}
+    assert client.calls == [["a", "b", "c"], ["a", "c"]]
+    assert counters == [{"agreement_types#NDA": 2}]
+
+
+def test_bulk_retries_throttling_then_reports_errors(monkeypatch, counters):
+    throttled = _error(
+        TransactionCanceledException,
+        "TransactionCanceledException",
+        [{"Code": "ThrottlingError"}],
+    )
+    client = FakeClient(failures=[throttled] * persistence.TRANSACT_MAX_ATTEMPTS)
+    _use(monkeypatch, client)
+
+    statuses = write_documents_bulk([_doc("a")])
+
+    assert len(client.calls) == persistence.TRANSACT_MAX_ATTEMPTS
+    assert statuses["a"].startswith("ERROR")
+    assert counters == []
+
+
+def test_bulk_recovers_from_a_transient_conflict(monkeypatch, counters):
+    conflict = _error(
+        TransactionCanceledException,
+        "TransactionCanceledException",
+        [{"Code": "TransactionConflict"}],
+    )
+    client = FakeClient(failures=[conflict])
+    _use(monkeypatch, client)
+
+    assert write_documents_bulk([_doc("a")]) == {"a": "OK"}
+    assert len(client.calls) == 2
+
+
+def test_bulk_keeps_counters_of_committed_chunks(monkeypatch, counters):
+    monkeypatch.setattr(persistence, "TRANSACT_MAX_ITEMS", 2)
+    boom = _error(ClientError, "InternalServerError")
+    client = FakeClient(failures=[None, boom])
+    _use(monkeypatch, client)
+
+    statuses = write_documents_bulk([_doc("a"), _doc("b"), _doc("c")])
+
+    assert statuses["a"] == statuses["b"] == "OK"
+    assert statuses["c"].startswith("ERROR")
+    assert counters == [{"agreement_types#NDA": 2}]
+
+
+def test_bulk_dedupes_an_object_seen_twice(monkeypatch, counters):
+    client = FakeClient()
+    _use(monkeypatch, client)
+
+    newer = _doc("a", lm="2024-05-03T00:00:00+00:00", agreement="MSA")
+    older = _doc("a", lm="2024-05-01T00:00:00+00:00", agreement="NDA")
+    statuses = write_documents_bulk([newer, older])
+
+    assert statuses == {"a": "OK"}
+    assert client.calls == [["a"]]
+    assert counters == [{"agreement_types#MSA": 1}]
+
+
+def test_bulk_skips_rows_already_newer_without_writing(monkeypatch, counters):
+    stored = {"a": {"documentId": "a", "lastModified": "2024-06-01T00:00:00+00:00"}}
+    client = FakeClient(stored=stored)
+    _use(monkeypatch, client)
+
+    assert write_documents_bulk([_doc("a"), _doc("b")]) == {"a": "STALE", "b": "OK"}
+    assert client.calls == [["b"]]
+
+
+def test_bulk_puts_plain_values_with_the_freshness_condition():
+    item = _doc("a")
+    put = persistence._transact_put(item)["Put"]
+    assert put["TableName"] == config.DOCUMENTS_TABLE
+    assert put["Item"] is item  # the resource's client serializes it
+    assert put["ConditionExpression"].startswith("attribute_not_exists(lastModified)")
+    assert put["ExpressionAttributeValues"] == {":lm": item["lastModified"]}
+
+
+def test_counter_updates_bump_the_reconcile_version(monkeypatch):
+    client = FakeClient()
+    _use(monkeypatch, client)
+    monkeypatch.setattr(config, "STATS_TABLE", "stats")
+
+    persistence.update_dashboard_counters({"agreement_types#NDA": 1})
+
+    update = client.updates[0]
+    assert update["UpdateExpression"] == "ADD #ver :one, #c0 :d0"
+    assert update["ExpressionAttributeNames"]["#ver"] == "counterVersion"
+    assert update["ExpressionAttributeValues"] == {":one": 1, ":d0": 1}
@@ -0,0 +1,71 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app import config, s3_io
+from app.s3_io import open_s3_object
+
+
+# ---------- helpers / fakes ----------
+
+
+class FakeBody:
+    def __init__(self, data):
+        self.data = data
+
+    def iter_chunks(self, chunk_size):
+        for i in range(0, len(self.data), chunk_size):
+            yield self.data[i : i + chunk_size]
+
+
+class FakeS3:
+    def __init__(self, data):
+        self.data = data
+
+    def get_object(self, Bucket, Key):
+        return {
+            "Body": FakeBody(self.data),
+            "ContentLength": len(self.data),
+            "ContentType": "application/pdf",
+            "LastModified": datetime(2024, 5, 1, 10, 0, tzinfo=timezone.utc),
+            "ETag": '"abc"',
+        }
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    def _use(data):
+        monkeypatch.setattr(config, "s3", FakeS3(data))
+
+    monkeypatch.setattr(s3_io, "_READ_CHUNK", 1024)
+    return _use
+
+
+# ---------- tests ----------
+
+
+def test_large_object_spills_to_disk_with_its_metadata(s3, monkeypatch):
+    data = bytes(range(256)) * 40  # 10 KiB
+    s3(data)
+    monkeypatch.setattr(config, "S3_SPOOL_MAX_BYTES", 4096)
+
+    with open_s3_object("docs", "uploads/big.pdf") as (f, meta):
+        assert f._rolled  # backed by a temp file, not memory
+        assert f.read() == data
+    assert f.closed
+
+    assert meta == {
+        "size": len(data),
+        "contentType": "application/pdf",
+        "lastModified": "2024-05-01T10:00:00+00:00",
+        "etag": '"abc"',
+    }
+
+
+def test_small_object_stays_in_memory(s3):
+    s3(b"# NDA")
+
+    with open_s3_object("docs", "uploads/nda.md", spool_max_bytes=4096) as (f, meta):
+        assert not f._rolled
+        assert f.read() == b"# NDA"
+    assert meta["size"] == 5